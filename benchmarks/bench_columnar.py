@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Compare memory held by list-of-lists rows and the columnar table store.
+
+Run from the project root:
+
+    python benchmarks/bench_columnar.py [--rows N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SRC_PATH = PROJECT_ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from table_tool.cli import iter_rows, normalise_rows  # noqa: E402
+from table_tool.columnar import ColumnarTable  # noqa: E402
+
+REGIONS = ["eu-west-1", "us-east-1", "ap-south-1", "sa-east-1"]
+STATUSES = ["ok", "degraded", "down", "pending"]
+
+
+def make_lines(rows: int, seed: int = 1) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(REGIONS)}|{rng.choice(STATUSES)}|web-{rng.randrange(40):02d}|{rng.randrange(500)}\n"
+        for _ in range(rows)
+    ]
+
+
+def held_bytes(build) -> int:
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    lines = make_lines(args.rows)
+    as_lists = held_bytes(lambda: normalise_rows(list(iter_rows(lines))))
+    as_columns = held_bytes(lambda: ColumnarTable.from_rows(iter_rows(lines)))
+    print(f"list rows: {as_lists / 1e6:8.1f} MB")
+    print(f"columnar:  {as_columns / 1e6:8.1f} MB  ({as_lists / as_columns:.1f}x smaller)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Compare rendering compressed input as a stream with decompressing it first.
+
+Run from the project root:
+
+    python benchmarks/bench_compressed.py [--rows N] [--formats gz,bz2,xz,zst]
+
+The input is generated as in ``bench_pipeline.py`` and compressed once per
+format. For each format the script reports the total wall time of:
+
+* ``to disk``: decompress into a temporary file, then render that file;
+* ``streamed, thread``: render straight from the compressed file,
+  decompressing in a background thread while the main thread parses and
+  renders (the default when more than one CPU is available);
+* ``streamed, no thread``: the same in a single thread.
+
+Output goes to the null device, so only decompression, parsing, rendering and
+encoding are timed. ``plain`` renders the uncompressed file for reference.
+Formats whose library is missing (zst without ``zstandard`` before Python
+3.14) are skipped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SRC_PATH = PROJECT_ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from bench_pipeline import make_lines, parse_mix  # noqa: E402
+
+from table_tool.inputs import iter_mapped_lines  # noqa: E402
+from table_tool.compressed import (  # noqa: E402
+    COMPRESSIONS,
+    iter_compressed_file,
+    open_compressed,
+)
+from table_tool.output import BufferedTextWriter  # noqa: E402
+from table_tool.render import iter_text_lines  # noqa: E402
+
+
+def render_lines(lines) -> None:
+    with open(os.devnull, "wb") as sink:
+        out = BufferedTextWriter(sink)
+        out.write_lines(iter_text_lines(lines))
+        out.flush()
+
+
+def decompress_then_render(path: str, compression: str, directory: str) -> None:
+    target = os.path.join(directory, "decompressed.txt")
+    with open(path, "rb") as raw, open_compressed(raw, compression) as stream:
+        with open(target, "wb") as plain:
+            shutil.copyfileobj(stream, plain, 1 << 20)
+    try:
+        render_lines(iter_mapped_lines(target))
+    finally:
+        os.unlink(target)
+
+
+def best_time(case, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--columns", type=int, default=8)
+    parser.add_argument("--cell-length", type=int, default=12)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("ascii=8,cjk=1,emoji=1"))
+    parser.add_argument("--formats", default=",".join(COMPRESSIONS))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = "".join(make_lines(args.rows, args.columns, args.cell_length, args.mix)).encode()
+    with tempfile.TemporaryDirectory() as directory:
+        plain = os.path.join(directory, "input.txt")
+        Path(plain).write_bytes(data)
+        print(f"{'format':<7} {'case':<20} {'seconds':>8} {'MB':>8}")
+        seconds = best_time(lambda: render_lines(iter_mapped_lines(plain)), args.repeat)
+        print(f"{'-':<7} {'plain':<20} {seconds:>8.3f} {len(data) / 1e6:>8.1f}")
+        for compression in args.formats.split(","):
+            path = os.path.join(directory, f"input.{compression}")
+            try:
+                with open(path, "wb") as raw, open_compressed(raw, compression, "wb") as sink:
+                    sink.write(data)
+            except ValueError as exc:
+                print(f"{compression:<7} skipped: {exc}")
+                continue
+            size = os.path.getsize(path)
+            cases = {
+                "to disk": lambda: decompress_then_render(path, compression, directory),
+                "streamed, thread": lambda: render_lines(
+                    iter_compressed_file(path, compression, background=True)
+                ),
+                "streamed, no thread": lambda: render_lines(
+                    iter_compressed_file(path, compression, background=False)
+                ),
+            }
+            for name, case in cases.items():
+                seconds = best_time(case, args.repeat)
+                print(f"{compression:<7} {name:<20} {seconds:>8.3f} {size / 1e6:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
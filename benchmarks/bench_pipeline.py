@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""Measure throughput and peak memory of each stage of the render pipeline.
+
+Run from the project root:
+
+    python benchmarks/bench_pipeline.py [--rows N] [--columns N] [--cell-length N]
+        [--mix ascii=8,cjk=1,emoji=1] [--remove-mix ascii=1] [--output results.json]
+        [--baseline baseline.json] [--threshold 0.10]
+
+Input is generated from a fixed seed, so two runs with the same options see
+the same data. Each case reports the best of ``--repeat`` timed runs as rows
+and megabytes of input per second, and the peak traced allocation of one
+extra run under tracemalloc. Widths of non-ASCII text are memoised, so the
+timings describe a warm process.
+
+With ``--baseline`` every case is compared with the stored result of the same
+name; the script exits with status 1 if any case lost more than
+``--threshold`` of its throughput or grew its peak memory by more than that
+fraction. Save a baseline by running once with ``--output``.
+
+The ``remove ... text`` and ``remove ... bytes`` cases read a table rendered
+from a second dataset of the same shape, generated with ``--remove-mix``. It
+defaults to ASCII only, because ``-r`` falls back to the text path for
+non-ASCII input and ``bytes`` would otherwise time that fallback rather than
+the bytes-level path.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SRC_PATH = PROJECT_ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from table_tool.inputs import remove_table  # noqa: E402
+from table_tool.output import BufferedTextWriter  # noqa: E402
+from table_tool.rawremove import remove_stream  # noqa: E402
+from table_tool.render import (  # noqa: E402
+    column_widths,
+    iter_csv_rows,
+    parse_rows,
+    render_table,
+    render_text,
+)
+
+ALPHABETS = {
+    "ascii": "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_.",
+    "cjk": "東京大阪府長い名前北京市朝阳区서울특별시ｶﾀｶﾅ漢字表示幅",
+    "emoji": "😀🎉🚀🔥✅🌍📦🧪🐍💡",
+}
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    """Parse ``ascii=8,cjk=1,emoji=1`` into relative weights per alphabet."""
+    mix: dict[str, int] = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ALPHABETS:
+            raise argparse.ArgumentTypeError(f"unknown alphabet '{name}'")
+        try:
+            mix[name] = int(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight '{weight}'") from None
+    return mix
+
+
+def make_lines(
+    rows: int,
+    columns: int,
+    cell_length: int,
+    mix: dict[str, int],
+    *,
+    distinct: int = 5000,
+    seed: int = 1,
+) -> list[str]:
+    """Generate delimited lines whose cells are drawn from a pool of values.
+
+    Each cell takes its characters from one alphabet chosen by ``mix`` weight
+    and is between half and all of ``cell_length`` characters long.
+    """
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    pool = []
+    for _ in range(distinct):
+        alphabet = ALPHABETS[rng.choices(names, weights)[0]]
+        length = rng.randint(max(1, cell_length // 2), max(1, cell_length))
+        pool.append("".join(rng.choice(alphabet) for _ in range(length)))
+    return [
+        "|".join(rng.choice(pool) for _ in range(columns)) + "\n"
+        for _ in range(rows)
+    ]
+
+
+def build_cases(lines: list[str], remove_lines: list[str]) -> dict[str, object]:
+    """Return the benchmark cases by name, each a zero-argument callable.
+
+    The text and bytes ``remove`` cases read a table rendered from ``remove_lines``.
+    """
+    rows = parse_rows(lines)
+    rendered = {
+        style: render_text(lines, style=style).splitlines(keepends=True)
+        for style in ("t", "g")
+    }
+    remove_tables = {
+        style: render_text(remove_lines, style=style).encode("utf-8") for style in ("t", "g")
+    }
+    csv_lines = [line.replace("|", ",") for line in lines]
+    cases: dict[str, object] = {
+        "parse": lambda: parse_rows(lines),
+        "parse --csv": lambda: list(iter_csv_rows(csv_lines)),
+        "measure": lambda: column_widths(rows),
+        "transpose": lambda: render_text(lines, transpose=True),
+    }
+    for style in ("t", "m", "g"):
+        for interval in (3, 0, "x"):
+            cases[f"render -s {style} -b {interval}"] = (
+                lambda style=style, interval=interval: render_table(
+                    rows, style=style, thick_border_interval=interval
+                )
+            )
+    cases["pipeline"] = lambda: render_text(lines)
+    cases["pipeline --csv"] = lambda: render_text(csv_lines, delimiter=",", csv_quoting=True)
+    for style, table_lines in rendered.items():
+        cases[f"remove -s {style}"] = lambda table_lines=table_lines: remove_table(
+            table_lines, io.StringIO()
+        )
+        # Both read and write bytes, like the command line does.
+        table_bytes = remove_tables[style]
+        cases[f"remove -s {style} text"] = lambda table_bytes=table_bytes: remove_table(
+            io.TextIOWrapper(io.BytesIO(table_bytes), encoding="utf-8"),
+            BufferedTextWriter(io.BytesIO()),
+        )
+        cases[f"remove -s {style} bytes"] = lambda table_bytes=table_bytes: remove_stream(
+            io.BytesIO(table_bytes),
+            BufferedTextWriter(io.BytesIO()),
+            delimiter="|",
+            style=None,
+            errors="strict",
+            split_lines=True,
+        )
+    return cases
+
+
+def run_case(case, repeat: int) -> tuple[float, int]:
+    """Return the best wall time over ``repeat`` runs and the traced peak bytes."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        case()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Describe every case that regressed beyond ``threshold`` against ``baseline``."""
+    regressions = []
+    for name, current in results["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        if previous is None:
+            continue
+        if current["rows_per_s"] < previous["rows_per_s"] * (1 - threshold):
+            regressions.append(
+                f"{name}: {current['rows_per_s']:,.0f} rows/s, "
+                f"baseline {previous['rows_per_s']:,.0f}"
+            )
+        if current["peak_bytes"] > previous["peak_bytes"] * (1 + threshold):
+            regressions.append(
+                f"{name}: peak {current['peak_bytes'] / 1e6:.1f} MB, "
+                f"baseline {previous['peak_bytes'] / 1e6:.1f} MB"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--columns", type=int, default=8)
+    parser.add_argument("--cell-length", type=int, default=12)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("ascii=8,cjk=1,emoji=1"))
+    parser.add_argument("--remove-mix", type=parse_mix, default=parse_mix("ascii=1"))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--filter", default="", help="only run cases containing this text")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare with results saved by --output")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    lines = make_lines(args.rows, args.columns, args.cell_length, args.mix)
+    remove_lines = make_lines(args.rows, args.columns, args.cell_length, args.remove_mix)
+    input_bytes = sum(len(line.encode("utf-8")) for line in lines)
+    results = {
+        "parameters": {
+            "rows": args.rows,
+            "columns": args.columns,
+            "cell_length": args.cell_length,
+            "mix": args.mix,
+            "remove_mix": args.remove_mix,
+        },
+        "python": platform.python_version(),
+        "cases": {},
+    }
+    print(f"{'case':<20} {'rows/s':>12} {'MB/s':>8} {'peak MB':>9}")
+    for name, case in build_cases(lines, remove_lines).items():
+        if args.filter not in name:
+            continue
+        seconds, peak = run_case(case, args.repeat)
+        results["cases"][name] = {
+            "seconds": seconds,
+            "rows_per_s": args.rows / seconds,
+            "mb_per_s": input_bytes / seconds / 1e6,
+            "peak_bytes": peak,
+        }
+        print(
+            f"{name:<20} {args.rows / seconds:>12,.0f} "
+            f"{input_bytes / seconds / 1e6:>8.1f} {peak / 1e6:>9.1f}"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        if baseline.get("parameters") != results["parameters"]:
+            print("warning: baseline was recorded with different parameters", file=sys.stderr)
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"regression: {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Measure how rendering throughput scales with the number of threads.
+
+Run from the project root, on a regular and on a free-threaded build:
+
+    python benchmarks/bench_threads.py [--rows N] [--tables N] [--max-threads N]
+
+Every thread renders its share of ``--tables`` independent tables, each with
+``--rows`` rows of mixed ASCII and CJK cells, through one case at a time:
+``display_width`` over every cell, ``column_widths``, ``render_table`` and
+``extract_table_rows`` on the rendered text. The thread count doubles from 1
+up to ``--max-threads`` (default: the CPU count). Each case reports tables per
+second and the speedup over one thread; with the GIL enabled the speedup stays
+near 1, while a free-threaded build should approach the thread count.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SRC_PATH = PROJECT_ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from table_tool.render import (  # noqa: E402
+    column_widths,
+    extract_table_rows,
+    render_table,
+)
+from table_tool.width import display_width  # noqa: E402
+
+VALUES = ["ok", "error", "web-01.example.com", "eu-west-1", "東京", "長い名前", "서울특별시"]
+
+
+def make_rows(rows: int, columns: int = 6, seed: int = 1) -> list[list[str]]:
+    rng = random.Random(seed)
+    return [
+        [f"{rng.choice(VALUES)}{rng.randrange(100)}" for _ in range(columns)]
+        for _ in range(rows)
+    ]
+
+
+def build_cases(rows: list[list[str]]) -> dict[str, object]:
+    """Return the cases by name, each rendering one table per call."""
+    rendered = render_table(rows, style="g").splitlines()
+    cells = [cell for row in rows for cell in row]
+    return {
+        "display_width": lambda: sum(map(display_width, cells)),
+        "column_widths": lambda: column_widths(rows),
+        "render_table": lambda: render_table(rows),
+        "extract_table_rows": lambda: extract_table_rows(rendered, style="g"),
+    }
+
+
+def run(case, tables: int, threads: int) -> float:
+    """Return tables per second with ``tables`` calls spread over ``threads``."""
+    per_thread = [tables // threads + (idx < tables % threads) for idx in range(threads)]
+
+    def work(count: int) -> None:
+        for _ in range(count):
+            case()
+
+    with ThreadPoolExecutor(threads) as pool:
+        # Start the workers before timing so thread creation is not measured.
+        list(pool.map(lambda _: None, range(threads)))
+        start = time.perf_counter()
+        list(pool.map(work, per_thread))
+        return tables / (time.perf_counter() - start)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--tables", type=int, default=64)
+    parser.add_argument("--max-threads", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    counts = []
+    threads = 1
+    while threads <= args.max_threads:
+        counts.append(threads)
+        threads *= 2
+    rows = make_rows(args.rows)
+    cases = build_cases(rows)
+    for case in cases.values():
+        # Warm the width memo so every run measures the same work.
+        case()
+    print(f"{'case':<20} {'threads':>7} {'tables/s':>10} {'speedup':>8}")
+    for name, case in cases.items():
+        base = None
+        for threads in counts:
+            rate = run(case, args.tables, threads)
+            base = base or rate
+            print(f"{name:<20} {threads:>7} {rate:>10.1f} {rate / base:>7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Compare the memoised width engine with a plain per-call wcswidth.
+
+Run from the project root:
+
+    python benchmarks/bench_width.py [--rows N] [--repeat N]
+
+Both runs time ``render.render_table``. The legacy run swaps the
+``display_width`` that ``table_tool.render`` measures and pads cells with for
+a plain per-call wcswidth; that module-level name is the only one the
+rendering code looks up.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SRC_PATH = PROJECT_ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from wcwidth import wcswidth  # noqa: E402
+
+from table_tool import render  # noqa: E402
+
+ASCII_VALUES = ["ok", "error", "200", "404", "web-01.example.com", "eu-west-1", "pending"]
+CJK_VALUES = ["東京", "大阪府", "長い名前", "名", "北京市朝阳区", "서울특별시", "ｶﾀｶﾅ"]
+
+
+def legacy_display_width(text: str) -> int:
+    width = wcswidth(text)
+    return width if width >= 0 else len(text)
+
+
+def make_rows(kind: str, rows: int, columns: int, seed: int = 1) -> list[list[str]]:
+    rng = random.Random(seed)
+    if kind == "ascii":
+        pool = ASCII_VALUES
+    elif kind == "cjk":
+        pool = CJK_VALUES
+    else:
+        pool = ASCII_VALUES + CJK_VALUES
+    return [
+        [f"{rng.choice(pool)}{rng.randrange(50)}" for _ in range(columns)]
+        for _ in range(rows)
+    ]
+
+
+def time_render(rows: list[list[str]], repeat: int) -> float:
+    return min(
+        timeit.repeat(lambda: render.render_table(rows), number=1, repeat=repeat)
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--columns", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine_width = render.display_width
+    print(f"{'input':<8} {'legacy (s)':>11} {'engine (s)':>11} {'speedup':>8}")
+    for kind in ("ascii", "cjk", "mixed"):
+        rows = make_rows(kind, args.rows, args.columns)
+        render.display_width = legacy_display_width
+        try:
+            legacy = time_render(rows, args.repeat)
+        finally:
+            render.display_width = engine_width
+        engine = time_render(rows, args.repeat)
+        print(f"{kind:<8} {legacy:>11.3f} {engine:>11.3f} {legacy / engine:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
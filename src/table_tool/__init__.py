@@ -1,5 +1,27 @@
-"""Table rendering package."""
+"""Table rendering package.
 
-from .cli import main  # re-export for convenience
+Attributes are resolved lazily so that ``import table_tool`` stays cheap: the
+command line (and ``argparse``) is only loaded when ``main`` is used.
+"""
 
-__all__ = ["main"]
+__all__ = ["RenderPlan", "RenderStats", "Table", "main", "render_table"]
+
+
+def __getattr__(name: str) -> object:
+    if name == "main":
+        from .cli import main
+
+        return main
+    if name in ("RenderPlan", "render_table"):
+        from . import render
+
+        return getattr(render, name)
+    if name == "RenderStats":
+        from .stats import RenderStats
+
+        return RenderStats
+    if name == "Table":
+        from .table import Table
+
+        return Table
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,179 @@
+"""Render many input files in one process.
+
+Inputs come from the command line (literal paths or glob patterns) and from an
+optional manifest with one path per line. Each file is rendered to a path
+derived from ``--output-dir`` and ``--suffix``; a failing file is reported on
+stderr and does not stop the rest of the batch. With ``--jobs`` above one the
+files are spread over a process pool.
+
+``--suffix`` is appended to the input file name, unless it is a template with
+``{name}``, ``{stem}`` or ``{ext}`` fields, which then gives the whole output
+name: ``{stem}.table`` names the output of ``report.txt`` ``report.table``.
+Inputs whose outputs would land on the same path (``a/x.txt`` and ``b/x.txt``
+with one ``--output-dir``) are all reported as failures before anything is
+rendered, rather than overwriting each other.
+"""
+
+from __future__ import annotations
+
+import glob
+import io
+import os
+import string
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import repeat
+from pathlib import Path
+
+from .inputs import load_lines, remove_table
+from .render import render_text
+
+# Annotation-only imports; the typing module is not needed at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+    from typing import Any, BinaryIO, TextIO
+
+GLOB_CHARACTERS = "*?["
+
+
+def collect_inputs(patterns: Iterable[str], manifest: Iterable[str] = ()) -> list[str]:
+    """Expand glob patterns and append manifest entries, keeping their order.
+
+    A pattern that matches nothing is kept as-is so that it is reported as a
+    missing file rather than silently dropped.
+    """
+    sources: list[str] = []
+    for pattern in patterns:
+        matches: list[str] = []
+        if any(char in pattern for char in GLOB_CHARACTERS):
+            matches = sorted(glob.glob(pattern, recursive=True))
+        sources.extend(matches or [pattern])
+    sources.extend(line.strip() for line in manifest if line.strip())
+    return sources
+
+
+def is_template(suffix: str) -> bool:
+    """Tell whether ``suffix`` has replacement fields; see the module docstring."""
+    return any(field is not None for _, field, _, _ in string.Formatter().parse(suffix))
+
+
+def output_name(name: str, suffix: str) -> str:
+    """Return the output file name for the input file ``name``."""
+    if not is_template(suffix):
+        return f"{name}{suffix}"
+    stem, ext = os.path.splitext(name)
+    return suffix.format(name=name, stem=stem, ext=ext)
+
+
+def output_path(source: str, output_dir: str | None, suffix: str) -> Path:
+    path = Path(source)
+    directory = Path(output_dir) if output_dir else path.parent
+    return directory / output_name(path.name, suffix)
+
+
+def find_conflicts(sources: list[str], targets: list[str]) -> list[str | None]:
+    """Return, for each source, why its target cannot be written, or None.
+
+    A target shared by several sources is a conflict for all of them.
+    """
+    owners: dict[str, list[int]] = {}
+    for index, target in enumerate(targets):
+        owners.setdefault(os.path.realpath(target), []).append(index)
+    conflicts: list[str | None] = []
+    for index, target in enumerate(targets):
+        others = [other for other in owners[os.path.realpath(target)] if other != index]
+        if others:
+            listed = ", ".join(f"'{sources[other]}'" for other in others)
+            conflicts.append(f"output '{target}' would also be written for {listed}")
+        else:
+            conflicts.append(None)
+    return conflicts
+
+
+def render_file(source: str, target: str, options: Mapping[str, Any]) -> None:
+    """Render ``source`` into ``target``; ``target`` is only replaced on success."""
+    if Path(target).resolve() == Path(source).resolve():
+        raise ValueError("refusing to overwrite the input file")
+    partial = f"{target}.partial"
+    try:
+        with open(partial, "wb") as raw, open_target(raw, options["compress"]) as out:
+            if options["remove"]:
+                remove_table(
+                    load_lines(source),
+                    out,
+                    delimiter=options["delimiter"],
+                    style=options["style"],
+                )
+            else:
+                out.write(
+                    render_text(
+                        load_lines(source),
+                        delimiter=options["delimiter"],
+                        thick_border_interval=options["thick_border_interval"],
+                        style=options["style"] or "t",
+                        transpose=options["transpose"],
+                        max_widths=options["max_widths"],
+                        overflow=options["overflow"],
+                        csv_quoting=options["csv"],
+                    )
+                )
+                out.write("\n")
+        os.replace(partial, target)
+    except BaseException:
+        if os.path.exists(partial):
+            os.unlink(partial)
+        raise
+
+
+def open_target(raw: BinaryIO, compression: str | None) -> TextIO:
+    """Return a UTF-8 text stream over ``raw``, compressed as ``compression`` says."""
+    if compression is not None:
+        from .compressed import open_compressed
+
+        raw = open_compressed(raw, compression, "wb")
+    return io.TextIOWrapper(raw, encoding="utf-8")
+
+
+def try_render_file(source: str, target: str, options: Mapping[str, Any]) -> str | None:
+    """Run ``render_file`` and return the error message instead of raising."""
+    try:
+        render_file(source, target, options)
+    except Exception as exc:  # noqa: BLE001
+        return str(exc)
+    return None
+
+
+def run_batch(
+    sources: list[str],
+    *,
+    output_dir: str | None,
+    suffix: str,
+    jobs: int,
+    options: Mapping[str, Any],
+    err: TextIO,
+) -> int:
+    """Render every source; return 0 when all succeed and 1 otherwise."""
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    targets = [os.fspath(output_path(source, output_dir, suffix)) for source in sources]
+    conflicts = find_conflicts(sources, targets)
+    pending = [index for index, conflict in enumerate(conflicts) if conflict is None]
+    failures = 0
+    with ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else nullcontext() as pool:
+        mapper = pool.map if pool is not None else map
+        rendered = mapper(
+            try_render_file,
+            [sources[index] for index in pending],
+            [targets[index] for index in pending],
+            repeat(options),
+        )
+        for source, conflict in zip(sources, conflicts):
+            error = conflict if conflict is not None else next(rendered)
+            if error is not None:
+                failures += 1
+                print(f"error: {source}: {error}", file=err)
+    if failures:
+        print(f"{failures} of {len(sources)} files failed", file=err)
+        return 1
+    return 0
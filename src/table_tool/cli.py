@@ -1,42 +1,78 @@
+"""Command-line entry point: argument parsing and output modes.
+
+``argparse`` is imported only when a parser is actually built or an option is
+validated. The rendering core lives in ``table_tool.render`` and the input
+layer in ``table_tool.inputs``; both are re-exported here for compatibility.
+"""
+
 from __future__ import annotations
 
-import argparse
+import os
 import sys
-from pathlib import Path
-from typing import Iterable, List, Sequence
+from itertools import chain, islice
+
+from .inputs import (  # noqa: F401 - re-exported for compatibility
+    MAP_BLOCK_SIZE,
+    iter_mapped_lines,
+    load_line_batches,
+    load_lines,
+    remove_table,
+)
+from .output import DEFAULT_BUFFER_SIZE, open_output, silence_stdout
+from .render import (  # noqa: F401 - re-exported for library callers
+    OVERFLOW_MODES,
+    STYLE_DEFINITIONS,
+    STYLE_LOOKAHEAD,
+    TRUNCATION_MARK,
+    RenderPlan,
+    border_name,
+    cap_widths,
+    column_widths,
+    detect_style,
+    extract_table_rows,
+    fit_row,
+    fold_rows,
+    iter_rows,
+    iter_table_lines,
+    iter_table_rows,
+    iter_text_lines,
+    normalise_rows,
+    pad_cell,
+    padded_rows,
+    parse_rows,
+    render_table,
+    render_text,
+    row_parser,
+    sniff_style,
+    transpose_rows,
+    truncate_cell,
+    wrap_cell,
+)
+from .width import display_width  # noqa: F401 - re-exported for library callers
+
+# Annotation-only imports; the typing module is not needed at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import argparse
+    from collections.abc import Callable, Iterable, Iterator, Sequence
+    from typing import List, NoReturn, TextIO
 
-from wcwidth import wcswidth
+    from .output import BufferedTextWriter
 
 ALLOWED_DELIMITERS = {" ", "-", "/", "|", ","}
-STYLE_DEFINITIONS: dict[str, dict[str, object]] = {
-    "m": {
-        "vertical": "|",
-        "top": ("+", "+", "+", "-"),
-        "middle_thin": (" ", "+", "+", " "),
-        "middle_thick": ("+", "+", "+", "-"),
-        "bottom_thin": ("+", "+", "+", "-"),
-        "bottom_thick": ("+", "+", "+", "-"),
-    },
-    "t": {
-        "vertical": "|",
-        "top": ("+", "+", "+", "-"),
-        "middle_thin": ("+", "+", "+", "-"),
-        "middle_thick": ("+", "+", "+", "="),
-        "bottom_thin": ("+", "+", "+", "-"),
-        "bottom_thick": ("+", "+", "+", "="),
-    },
-    "g": {
-        "vertical": "│",
-        "top": ("┌", "┬", "┐", "─"),
-        "middle_thin": ("├", "┼", "┤", "─"),
-        "middle_thick": ("╞", "╪", "╡", "═"),
-        "bottom_thin": ("└", "┴", "┘", "─"),
-        "bottom_thick": ("╘", "╧", "╛", "═"),
-    },
-}
+
+
+class UsageError(Exception):
+    """A command-line mistake; ``main`` prints it after the usage line and returns 2."""
+
+
+class HelpRequested(Exception):
+    """Raised by ``--help`` so that ``main`` writes the help to its own stdout."""
 
 
 def parse_border_interval(value: str) -> int | str:
+    import argparse
+
     if value.lower() == "x":
         return "x"
     try:
@@ -52,145 +88,254 @@ def parse_border_interval(value: str) -> int | str:
     return parsed
 
 
+def parse_max_widths(value: str) -> List[int]:
+    import argparse
+
+    try:
+        caps = [int(part) for part in value.split(",")]
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(
+            "max width must be a positive integer or a comma-separated list of them"
+        ) from exc
+    if any(cap < 1 for cap in caps):
+        raise argparse.ArgumentTypeError(
+            "max width must be a positive integer or a comma-separated list of them"
+        )
+    return caps
+
+
+def parse_sample_size(value: str) -> int:
+    import argparse
+
+    try:
+        parsed = int(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("sample size must be a positive integer") from exc
+    if parsed < 1:
+        raise argparse.ArgumentTypeError("sample size must be a positive integer")
+    return parsed
+
+
+def parse_memory_size(value: str) -> int:
+    import argparse
+
+    units = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    text = value.strip().upper().removesuffix("B")
+    unit = text[-1:] if text[-1:] in units else ""
+    try:
+        parsed = int(text[: len(text) - len(unit)]) * units[unit]
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(
+            "memory size must be a positive number of bytes, optionally suffixed with K, M or G"
+        ) from exc
+    if parsed < 1:
+        raise argparse.ArgumentTypeError(
+            "memory size must be a positive number of bytes, optionally suffixed with K, M or G"
+        )
+    return parsed
+
+
+def parse_job_count(value: str) -> int:
+    import argparse
+
+    try:
+        parsed = int(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("job count must be a positive integer") from exc
+    if parsed < 1:
+        raise argparse.ArgumentTypeError("job count must be a positive integer")
+    return parsed
+
+
+def parse_row_count(value: str) -> int:
+    import argparse
+
+    try:
+        parsed = int(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("row count must be a positive integer") from exc
+    if parsed < 1:
+        raise argparse.ArgumentTypeError("row count must be a positive integer")
+    return parsed
+
+
+def parse_row_range(value: str) -> tuple[int, int | None]:
+    import argparse
+
+    message = "row range must be START:END with 1 <= START <= END; either side may be omitted"
+    start_text, separator, stop_text = value.partition(":")
+    try:
+        start = int(start_text) if start_text else 1
+        stop = int(stop_text) if stop_text else None
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(message) from exc
+    if not separator or start < 1 or (stop is not None and stop < start):
+        raise argparse.ArgumentTypeError(message)
+    return start, stop
+
+
+def parse_seconds(value: str) -> float:
+    import argparse
+
+    try:
+        parsed = float(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("interval must be a number of seconds, 0 or more") from exc
+    if not parsed >= 0 or parsed == float("inf"):
+        raise argparse.ArgumentTypeError("interval must be a number of seconds, 0 or more")
+    return parsed
+
+
+def parse_emit(value: str) -> tuple[str, str]:
+    import argparse
+
+    from .fanout import EMIT_FORMATS
+
+    format, separator, path = value.partition(":")
+    if not separator or not path or format not in EMIT_FORMATS:
+        raise argparse.ArgumentTypeError(
+            f"emit target must be FORMAT:PATH with FORMAT one of {', '.join(EMIT_FORMATS)}"
+        )
+    return format, path
+
+
+def parse_suffix(value: str) -> str:
+    import argparse
+
+    if not value:
+        return value
+    try:
+        # A file without an extension gives the shortest name a template can.
+        sample = value.format(name="x", stem="x", ext="")
+    except (KeyError, IndexError, ValueError):
+        raise argparse.ArgumentTypeError(
+            f"invalid suffix template {value!r}; the fields are {{name}}, {{stem}} and {{ext}}"
+        ) from None
+    if os.sep in sample or (os.altsep and os.altsep in sample):
+        raise argparse.ArgumentTypeError("the suffix must name a file, not a directory")
+    if not sample:
+        raise argparse.ArgumentTypeError("the suffix template gives an empty output name")
+    return value
+
+
 def parse_style(value: str) -> str:
+    import argparse
+
     key = value.lower()
     if key not in STYLE_DEFINITIONS:
         raise argparse.ArgumentTypeError("style must be 'm' (minimal), 't' (text) or 'g' (graphics)")
     return key
 
 
-def detect_style(lines: Sequence[str]) -> str:
-    for style_key, config in STYLE_DEFINITIONS.items():
-        vertical = config["vertical"]
-        for raw_line in lines:
-            line = raw_line.rstrip("\n")
-            if line and line.startswith(vertical) and line.endswith(vertical):
-                return style_key
-    return "t"
-
-
-def parse_rows(
+def sample_table(
     lines: Iterable[str],
+    out: TextIO,
     *,
-    skip_empty: bool = True,
+    sample_size: int,
+    max_widths: Sequence[int] | None = None,
+    overflow: str = "truncate",
     delimiter: str = "|",
-) -> List[List[str]]:
-    rows: List[List[str]] = []
-    for raw_line in lines:
-        line = raw_line.rstrip("\n")
-        if skip_empty and not line.strip():
-            continue
-        cells = [cell.strip() for cell in line.split(delimiter)]
-        rows.append(cells)
-    if not rows:
-        raise ValueError("no rows found in the input")
-    return rows
-
-
-def normalise_rows(rows: Sequence[List[str]]) -> List[List[str]]:
-    max_columns = max(len(row) for row in rows)
-    return [row + [""] * (max_columns - len(row)) for row in rows]
-
-
-def transpose_rows(rows: Sequence[Sequence[str]]) -> List[List[str]]:
-    return [list(column) for column in zip(*rows)]
+    thick_border_interval: int | str = 3,
+    style: str = "t",
+    csv_quoting: bool = False,
+) -> None:
+    """Render in a single pass, fixing column widths from the first rows.
 
+    Only the first ``sample_size`` rows are buffered. Their widths, clamped by
+    ``max_widths``, are final: later cells that do not fit are truncated or
+    wrapped according to ``overflow``, and rows with more columns than the
+    sample keep their surplus cells in the last column. Nothing is flushed
+    here; ``render_single`` passes the lines through ``flush_between_batches``
+    so that rows are shown as soon as they arrive.
+    """
+    rows = row_parser(csv_quoting)(lines, delimiter=delimiter)
+    sample = list(islice(rows, sample_size))
+    if not sample:
+        raise ValueError("no rows found in the input")
+    widths = cap_widths(column_widths(sample), max_widths)
+    for line in iter_table_lines(
+        fold_rows(chain(sample, rows), len(widths), delimiter),
+        widths,
+        thick_border_interval=thick_border_interval,
+        style=style,
+        overflow=overflow,
+    ):
+        out.write(line)
+        out.write("\n")
 
-def display_width(text: str) -> int:
-    """Return the printable width of a string, treating wide characters appropriately."""
-    width = wcswidth(text)
-    return width if width >= 0 else len(text)
 
+def flush_between_batches(batches: Iterable[Iterable[str]], out: TextIO) -> Iterator[str]:
+    """Yield the lines of ``batches``, flushing ``out`` before the next batch is read.
 
-def column_widths(rows: Sequence[Sequence[str]]) -> List[int]:
-    widths = [0] * len(rows[0])
-    for row in rows:
-        for idx, cell in enumerate(row):
-            widths[idx] = max(widths[idx], display_width(cell))
-    return widths
+    Everything rendered from a batch is on its way once the reader would wait
+    for more input, at one flush per batch rather than one per line.
+    """
+    for batch in batches:
+        yield from batch
+        out.flush()
 
 
-def extract_table_rows(
-    lines: Sequence[str],
-    *,
-    style: str | None = None,
-) -> List[List[str]]:
-    style_to_use = style or detect_style(lines)
-    vertical = STYLE_DEFINITIONS[style_to_use]["vertical"]
-    rows: List[List[str]] = []
-    for raw_line in lines:
-        line = raw_line.rstrip("\n")
-        if not line:
-            continue
-        if not (line.startswith(vertical) and line.endswith(vertical)):
-            continue
-        inner = line[1:-1]
-        cells = [cell.strip() for cell in inner.split(vertical)]
-        rows.append(cells)
-    if not rows:
-        raise ValueError("no table rows found in the input")
-    return rows
-
-
-def render_table(
-    rows: Sequence[Sequence[str]],
+def stream_table(
+    open_lines: Callable[[], Iterable[str]],
+    out: TextIO,
     *,
+    delimiter: str = "|",
     thick_border_interval: int | str = 3,
     style: str = "t",
-) -> str:
-    widths = column_widths(rows)
-
-    if thick_border_interval == "x":
-        lines = []
-        for row in rows:
-            padded_cells = [
-                f"{cell}{' ' * (width - display_width(cell))}"
-                for cell, width in zip(row, widths)
-            ]
-            lines.append(" ".join(padded_cells).rstrip())
-        return "\n".join(lines)
-
-    assert isinstance(thick_border_interval, int)
-
-    style_config = STYLE_DEFINITIONS[style]
-    vertical = style_config["vertical"]
-
-    def border(style: str) -> str:
-        left, mid, right, fill = style_config[style]
-        segments = [fill * (width + 2) for width in widths]
-        return left + mid.join(segments) + right
-
-    lines = [border("top")]
-    total_rows = len(rows)
-    # -------------------------------------------------
-    for row_index, row in enumerate(rows, start=1):
-        padded_cells = [
-            f" {cell}{' ' * (width - display_width(cell))} "
-            for cell, width in zip(row, widths)
-        ]
-        lines.append(vertical + vertical.join(padded_cells) + vertical)
-        use_thick_border = (
-            thick_border_interval > 0 and row_index % thick_border_interval == 0
-        )
-        is_last = row_index == total_rows
-        if is_last:
-            style_name = "bottom_thick" if use_thick_border else "bottom_thin"
-        else:
-            style_name = "middle_thick" if use_thick_border else "middle_thin"
+    max_widths: Sequence[int] | None = None,
+    overflow: str = "truncate",
+    csv_quoting: bool = False,
+) -> None:
+    """Render a table in two passes over a re-readable input.
 
-        if border(style_name)[0] != " ":
-            lines.append(border(style_name))
-
-    return "\n".join(lines)
+    The first pass only measures column widths; the second parses, pads and
+    writes each row as it is read, so memory use does not grow with the input.
+    Without ``max_widths`` the output matches ``render_table`` byte for byte.
+    """
+    parse = row_parser(csv_quoting)
+    widths = column_widths(parse(open_lines(), delimiter=delimiter))
+    if not widths:
+        raise ValueError("no rows found in the input")
+    rows = padded_rows(parse(open_lines(), delimiter=delimiter), len(widths))
+    if max_widths:
+        plan_overflow: str | None = overflow
+    else:
+        # With CSV input, overflow handling splits multi-line fields.
+        plan_overflow = "truncate" if csv_quoting else None
+    for line in iter_table_lines(
+        rows,
+        cap_widths(widths, max_widths),
+        thick_border_interval=thick_border_interval,
+        style=style,
+        overflow=plan_overflow,
+    ):
+        out.write(line)
+        out.write("\n")
 
 
 def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(
+    import argparse
+
+    class CommandParser(argparse.ArgumentParser):
+        # Errors and help are raised instead of printed, so ``main`` can write
+        # them to the streams it was given rather than the process's own.
+        def error(self, message: str) -> NoReturn:
+            raise UsageError(message)
+
+        def print_help(self, file: TextIO | None = None) -> None:
+            raise HelpRequested
+
+    parser = CommandParser(
         description="Render a delimited text file as an ASCII or Unicode table."
     )
     parser.add_argument(
-        "input",
-        help="Path to the input file. Use '-' to read from standard input.",
+        "inputs",
+        nargs="*",
+        metavar="input",
+        help=(
+            "Path to the input file. Use '-' to read from standard input. Several "
+            "paths or glob patterns render each file in batch mode."
+        ),
     )
     parser.add_argument(
         "-d",
@@ -219,6 +364,15 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Transpose the table before rendering, swapping rows with columns.",
     )
+    parser.add_argument(
+        "--max-memory",
+        type=parse_memory_size,
+        metavar="SIZE",
+        help=(
+            "With -t, keep at most SIZE bytes of rows in memory (e.g. 512M, 2G) and "
+            "spill the rest to temporary files."
+        ),
+    )
     parser.add_argument(
         "-s",
         "--style",
@@ -233,43 +387,642 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Remove borders/padding from a rendered table and output delimited data.",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Render in two passes over a seekable input (a file or redirected "
+            "stdin) so memory use stays constant regardless of the row count."
+        ),
+    )
+    parser.add_argument(
+        "--sample",
+        type=parse_sample_size,
+        metavar="N",
+        help=(
+            "Render in a single pass: fix column widths from the first N rows and "
+            "write every later row as soon as it is read (works on pipes)."
+        ),
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help=(
+            "Keep reading the input as it grows, like tail -f, and write each new row "
+            "as soon as it arrives. Stops when a piped input closes, or on Ctrl-C."
+        ),
+    )
+    parser.add_argument(
+        "--on-widen",
+        choices=("relayout", "mark"),
+        default="relayout",
+        help=(
+            "With --follow, what to do when a new row does not fit the columns: "
+            "'relayout' redraws the whole table with wider columns, at most once per "
+            "--relayout-interval (default), 'mark' keeps the widths and cuts or wraps "
+            "the cell as --overflow says."
+        ),
+    )
+    parser.add_argument(
+        "--relayout-interval",
+        type=parse_seconds,
+        default=1.0,
+        metavar="SECONDS",
+        help="With --follow, the minimum time between two re-layouts (default: 1).",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=parse_job_count,
+        default=1,
+        metavar="N",
+        help=(
+            "Parse, measure and render a regular input file in N worker processes, "
+            "or render N files at a time in batch mode. Ignored for standard input, "
+            "-t, -r and --sample on a single input (default: 1)."
+        ),
+    )
+    parser.add_argument(
+        "--manifest",
+        metavar="FILE",
+        help="Batch mode: read further input paths, one per line, from FILE ('-' for stdin).",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        metavar="DIR",
+        help="Batch mode: write each rendered file into DIR (default: next to its input).",
+    )
+    parser.add_argument(
+        "--suffix",
+        default="",
+        type=parse_suffix,
+        help=(
+            "Batch mode: append SUFFIX to each input file name to name its output. "
+            "A template with {name}, {stem} or {ext} fields gives the whole output "
+            "name instead, e.g. '{stem}.table'."
+        ),
+    )
+    parser.add_argument(
+        "--max-width",
+        type=parse_max_widths,
+        metavar="W[,W...]",
+        help=(
+            "Cap column widths. A single value applies to every column; a "
+            "comma-separated list caps columns in order and leaves the rest uncapped."
+        ),
+    )
+    parser.add_argument(
+        "--overflow",
+        choices=OVERFLOW_MODES,
+        default="truncate",
+        help=(
+            "How to fit cells wider than their column: 'truncate' cuts them and "
+            f"appends '{TRUNCATION_MARK}' (default), 'wrap' continues them on extra lines."
+        ),
+    )
+    parser.add_argument(
+        "--csv",
+        action="store_true",
+        help=(
+            "Parse the input as CSV with the given delimiter (use -d ,): quoted "
+            "fields may contain the delimiter, doubled quotes and line breaks."
+        ),
+    )
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument(
+        "--head",
+        type=parse_row_count,
+        metavar="N",
+        help="Render only the first N rows; the rest of the input is not read.",
+    )
+    selection.add_argument(
+        "--tail",
+        type=parse_row_count,
+        metavar="N",
+        help="Render only the last N rows; a regular file is read backwards from its end.",
+    )
+    selection.add_argument(
+        "--rows",
+        type=parse_row_range,
+        metavar="START:END",
+        help=(
+            "Render only rows START to END (1-based, inclusive; blank lines are not "
+            "rows). Reading stops after row END."
+        ),
+    )
+    parser.add_argument(
+        "--rows-index",
+        metavar="FILE",
+        help=(
+            "With --rows, keep a line-offset index of the input in FILE (built on "
+            "first use and whenever the input changes) and jump straight to START."
+        ),
+    )
+    parser.add_argument(
+        "--index",
+        metavar="FILE",
+        help=(
+            "Cache the rendered table and its column widths in FILE. When the input "
+            "has only been appended to, later runs parse just the new rows and reuse "
+            "the cached output unless a column has to grow."
+        ),
+    )
+    parser.add_argument(
+        "--output-buffer",
+        type=parse_memory_size,
+        default=DEFAULT_BUFFER_SIZE,
+        metavar="SIZE",
+        help=(
+            "Collect about SIZE characters of output (e.g. 64K, 1M) before encoding "
+            f"and writing them in one call (default: {DEFAULT_BUFFER_SIZE // 1024}K)."
+        ),
+    )
+    parser.add_argument(
+        "--emit",
+        type=parse_emit,
+        action="append",
+        metavar="FORMAT:PATH",
+        help=(
+            "Write the table as FORMAT to PATH ('-' for stdout) instead of the normal "
+            "output; repeat for several outputs from one parse. FORMAT is t, m, g, x "
+            "(borderless), delimited, tsv, markdown or html."
+        ),
+    )
+    parser.add_argument(
+        "--compress",
+        choices=("gz", "bz2", "xz", "zst"),
+        metavar="FORMAT",
+        help=(
+            "Compress the output as gz, bz2, xz or zst; in batch mode, every output "
+            "file. Compressed inputs are always detected and read transparently."
+        ),
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help=(
+            "Report wall time, CPU time and peak traced memory per stage, plus row, "
+            "column, cell and byte counts, on stderr. Memory tracing slows the "
+            "render down."
+        ),
+    )
+    parser.add_argument(
+        "--stats-format",
+        choices=("text", "json"),
+        default="text",
+        help="Write --stats as a text table (default) or as one line of JSON.",
+    )
     return parser
 
 
-def load_lines(input_path: str) -> Iterable[str]:
+_shared_parser: argparse.ArgumentParser | None = None
+
+
+def shared_parser() -> argparse.ArgumentParser:
+    """Return a parser built once per process; ``parse_args`` does not modify it."""
+    global _shared_parser
+    if _shared_parser is None:
+        _shared_parser = build_parser()
+    return _shared_parser
+
+
+def reopenable_lines(input_path: str, stdin: TextIO) -> Callable[[], Iterable[str]]:
+    """Return a callable that yields the input lines afresh on every call.
+
+    A compressed file is decompressed again on every call.
+    """
+    from .compressed import file_compression, iter_compressed_file, stream_compression
+
     if input_path == "-":
-        return sys.stdin
-    path = Path(input_path)
-    if not path.exists():
+        if not stdin.seekable():
+            raise ValueError("--stream needs a seekable input; standard input is a pipe")
+        if stream_compression(getattr(stdin, "buffer", None)) is not None:
+            raise ValueError("--stream cannot re-read compressed standard input; pass the file")
+        start = stdin.tell()
+
+        def rewind_stdin() -> Iterable[str]:
+            stdin.seek(start)
+            return stdin
+
+        return rewind_stdin
+    if not os.path.exists(input_path):
         raise FileNotFoundError(f"input file '{input_path}' does not exist")
-    return path.read_text(encoding="utf-8").splitlines(keepends=True)
+    if not os.path.isfile(input_path):
+        raise ValueError(f"--stream needs a seekable input; '{input_path}' is not a regular file")
+    compression = file_compression(input_path)
+    if compression is not None:
+        return lambda: iter_compressed_file(input_path, compression)
+    return lambda: iter_mapped_lines(input_path)
+
+
+def render_options(args: argparse.Namespace) -> dict[str, object]:
+    """Collect the per-file rendering options in a picklable form."""
+    return {
+        "delimiter": args.delimiter,
+        "thick_border_interval": args.thick_border_interval,
+        "style": args.style,
+        "transpose": args.transpose,
+        "remove": args.remove,
+        "max_widths": args.max_width,
+        "overflow": args.overflow,
+        "csv": args.csv,
+        "compress": args.compress,
+    }
+
+
+def select_lines(args: argparse.Namespace) -> Iterable[str]:
+    """Return the input lines, restricted to ``--head``, ``--tail`` or ``--rows``."""
+    if not selects_rows(args):
+        return load_lines(args.input, args.stdin)
+    from . import slicing
 
+    if args.tail is not None:
+        if is_plain_file(args.input):
+            return slicing.tail_file(args.input, args.tail)
+        return slicing.tail_stream(load_lines(args.input, args.stdin), args.tail)
+    start, stop = args.rows or (1, args.head)
+    if args.rows_index is not None:
+        if not is_plain_file(args.input):
+            raise ValueError("--rows-index needs a regular, uncompressed input file")
+        return slicing.select_indexed_range(args.input, args.rows_index, start, stop)
+    return slicing.select_range(load_lines(args.input, args.stdin), start, stop)
 
-def main(argv: list[str] | None = None) -> int:
-    parser = build_parser()
-    args = parser.parse_args(argv)
+
+def render_with_stats(args: argparse.Namespace, out: BufferedTextWriter) -> None:
+    """Render in memory like ``main`` and report per-stage statistics on stderr."""
+    from .stats import RenderStats
+
+    with RenderStats() as stats:
+        with stats.stage("load"):
+            lines = select_lines(args)
+        table = render_text(
+            lines,
+            delimiter=args.delimiter,
+            thick_border_interval=args.thick_border_interval,
+            style=args.style or "t",
+            transpose=args.transpose,
+            max_widths=args.max_width,
+            overflow=args.overflow,
+            csv_quoting=args.csv,
+            stats=stats,
+        )
+        with stats.stage("write"):
+            out.write(table)
+            out.write("\n")
+            out.flush()
+    stats.report(args.stderr, format=args.stats_format)
+
+
+def is_plain_file(input_path: str) -> bool:
+    """Tell whether ``input_path`` is a regular file that is not compressed."""
+    from .compressed import file_compression
+
+    return (
+        input_path != "-"
+        and os.path.isfile(input_path)
+        and file_compression(input_path) is None
+    )
+
+
+def selects_rows(args: argparse.Namespace) -> bool:
+    return args.head is not None or args.tail is not None or args.rows is not None
+
+
+def main_batch(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    from .batch import collect_inputs, run_batch
+
+    if not (args.output_dir or args.suffix):
+        parser.error("several inputs need --output-dir or --suffix to name their outputs")
+    if (
+        args.stream
+        or args.sample
+        or args.follow
+        or args.max_memory is not None
+        or args.stats
+        or args.index
+        or args.emit
+        or selects_rows(args)
+    ):
+        parser.error(
+            "--stream, --sample, --follow, --max-memory, --stats, --index, --emit, --head, "
+            "--tail and --rows cannot be used in batch mode"
+        )
+    if "-" in args.inputs:
+        parser.error("'-' cannot be used in batch mode; list files or use --manifest -")
+    if args.csv and args.remove:
+        parser.error("--csv cannot be combined with -r")
     try:
-        lines_iterable = load_lines(args.input)
-        lines = list(lines_iterable)
-        if args.remove:
-            table_rows = extract_table_rows(lines, style=args.style)
-            output_lines = [args.delimiter.join(row) for row in table_rows]
-            print("\n".join(output_lines))
-            return 0
-        rows = parse_rows(lines, delimiter=args.delimiter)
-        normalised_rows = normalise_rows(rows)
-        table_rows = transpose_rows(normalised_rows) if args.transpose else normalised_rows
-        style_for_render = args.style or "t"
-        table = render_table(
-            table_rows,
+        if args.manifest == "-":
+            sources = collect_inputs(args.inputs, args.stdin)
+        elif args.manifest is not None:
+            with open(args.manifest, encoding="utf-8") as manifest:
+                sources = collect_inputs(args.inputs, manifest)
+        else:
+            sources = collect_inputs(args.inputs)
+    except OSError as exc:
+        parser.print_usage(file=args.stderr)
+        print(f"error: {exc}", file=args.stderr)
+        return 1
+    return run_batch(
+        sources,
+        output_dir=args.output_dir,
+        suffix=args.suffix,
+        jobs=args.jobs,
+        options=render_options(args),
+        err=args.stderr,
+    )
+
+
+def render_single(args: argparse.Namespace, out: BufferedTextWriter, *, parallel: bool) -> None:
+    """Render ``args.input`` to ``out`` in the output mode the options select."""
+    if args.follow:
+        from .compressed import file_compression
+        from .follow import follow_table, out_is_terminal
+
+        if args.input != "-" and os.path.isfile(args.input) and file_compression(args.input):
+            raise ValueError("--follow cannot read a compressed input file")
+        follow_table(
+            args.input,
+            out,
+            stdin=args.stdin,
+            clear_screen=out_is_terminal(args.stdout),
+            delimiter=args.delimiter,
+            thick_border_interval=args.thick_border_interval,
+            style=args.style or "t",
+            max_widths=args.max_width,
+            overflow=args.overflow,
+            on_widen=args.on_widen,
+            relayout_interval=args.relayout_interval,
+        )
+        return
+    if args.emit:
+        from .fanout import emit_text
+
+        emit_text(
+            select_lines(args),
+            args.emit,
+            out=out,
+            compression=args.compress,
+            delimiter=args.delimiter,
+            thick_border_interval=args.thick_border_interval,
+            transpose=args.transpose,
+            max_widths=args.max_width,
+            overflow=args.overflow,
+            csv_quoting=args.csv,
+        )
+        return
+    if args.remove:
+        from .rawremove import remove_table_bytes
+
+        remove_table_bytes(
+            args.input, out, delimiter=args.delimiter, style=args.style, stdin=args.stdin
+        )
+        return
+    if args.index is not None:
+        from .incremental import render_incremental
+
+        if not os.path.isfile(args.input):
+            raise FileNotFoundError(f"input file '{args.input}' is not a regular file")
+        if not is_plain_file(args.input):
+            raise ValueError("--index cannot be used on a compressed input file")
+        render_incremental(
+            args.input,
+            args.index,
+            out,
+            delimiter=args.delimiter,
+            thick_border_interval=args.thick_border_interval,
+            style=args.style or "t",
+            max_widths=args.max_width,
+            overflow=args.overflow,
+        )
+        return
+    if parallel:
+        from .parallel import render_parallel
+
+        render_parallel(
+            args.input,
+            out,
+            jobs=args.jobs,
+            delimiter=args.delimiter,
             thick_border_interval=args.thick_border_interval,
-            style=style_for_render,
+            style=args.style or "t",
+            max_widths=args.max_width,
+            overflow=args.overflow,
         )
+        return
+    if args.stream:
+        stream_table(
+            reopenable_lines(args.input, args.stdin),
+            out,
+            delimiter=args.delimiter,
+            thick_border_interval=args.thick_border_interval,
+            style=args.style or "t",
+            max_widths=args.max_width,
+            overflow=args.overflow,
+            csv_quoting=args.csv,
+        )
+        return
+    if args.max_memory is not None:
+        from .spill import transpose_spilled
+
+        transpose_spilled(
+            iter_rows(load_lines(args.input, args.stdin), delimiter=args.delimiter),
+            out,
+            max_memory=args.max_memory,
+            thick_border_interval=args.thick_border_interval,
+            style=args.style or "t",
+        )
+        return
+    if args.sample:
+        sample_table(
+            flush_between_batches(load_line_batches(args.input, args.stdin), out),
+            out,
+            sample_size=args.sample,
+            max_widths=args.max_width,
+            overflow=args.overflow,
+            csv_quoting=args.csv,
+            delimiter=args.delimiter,
+            thick_border_interval=args.thick_border_interval,
+            style=args.style or "t",
+        )
+        return
+    if args.stats:
+        render_with_stats(args, out)
+        return
+    out.write_lines(
+        iter_text_lines(
+            select_lines(args),
+            delimiter=args.delimiter,
+            thick_border_interval=args.thick_border_interval,
+            style=args.style or "t",
+            transpose=args.transpose,
+            max_widths=args.max_width,
+            overflow=args.overflow,
+            csv_quoting=args.csv,
+        )
+    )
+
+
+def resolve_paths(args: argparse.Namespace, cwd: str) -> None:
+    """Make the relative path arguments in ``args`` relative to ``cwd`` instead."""
+
+    def resolve(path: str) -> str:
+        return path if path == "-" else os.path.join(cwd, path)
+
+    args.inputs = [resolve(path) for path in args.inputs]
+    for name in ("manifest", "output_dir", "index", "rows_index"):
+        value = getattr(args, name)
+        if value is not None:
+            setattr(args, name, resolve(value))
+    if args.emit:
+        args.emit = [(format, resolve(path)) for format, path in args.emit]
+
+
+def main(
+    argv: list[str] | None = None,
+    *,
+    stdin: TextIO | None = None,
+    stdout: TextIO | None = None,
+    stderr: TextIO | None = None,
+    cwd: str | None = None,
+) -> int:
+    """Run the command line and return its exit status.
+
+    The standard streams default to the process's own, and relative paths are
+    taken from the working directory unless ``cwd`` is given. The render server
+    passes each request's streams and directory here, so that concurrent
+    requests never touch process-wide state.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in ("serve", "client"):
+        from .server import main_server
+
+        return main_server(argv)
+    parser = shared_parser()
+    stdout = sys.stdout if stdout is None else stdout
+    stderr = sys.stderr if stderr is None else stderr
+    try:
+        args = parser.parse_args(argv)
+        args.stdin = sys.stdin if stdin is None else stdin
+        args.stdout, args.stderr = stdout, stderr
+        if cwd is not None:
+            resolve_paths(args, cwd)
+        if not args.inputs and args.manifest is None:
+            parser.error("the following arguments are required: input")
+        if len(args.inputs) > 1 or args.manifest is not None or args.output_dir or args.suffix:
+            return main_batch(parser, args)
+        return main_single(parser, args)
+    except HelpRequested:
+        stdout.write(parser.format_help())
+        return 0
+    except UsageError as exc:
+        parser.print_usage(file=stderr)
+        print(f"{parser.prog}: error: {exc}", file=stderr)
+        return 2
+
+
+def main_single(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    args.input = args.inputs[0]
+    if args.stream and args.transpose:
+        parser.error("--stream cannot be combined with -t/--transpose")
+    if args.sample and args.transpose:
+        parser.error("--sample cannot be combined with -t/--transpose")
+    if args.stream and args.sample:
+        parser.error("--stream and --sample are mutually exclusive")
+    if args.max_memory is not None and not args.transpose:
+        parser.error("--max-memory only applies to -t/--transpose")
+    if args.max_memory is not None and args.max_width:
+        parser.error("--max-memory cannot be combined with --max-width")
+    if args.stats and (args.remove or args.stream or args.sample or args.max_memory is not None):
+        parser.error("--stats only applies to the in-memory render")
+    if args.csv and (
+        args.remove or args.max_memory is not None or args.index or selects_rows(args)
+    ):
+        parser.error(
+            "--csv cannot be combined with -r, --max-memory, --index, --head, --tail or --rows"
+        )
+    if args.follow and (
+        args.transpose
+        or args.remove
+        or args.stream
+        or args.sample
+        or args.max_memory is not None
+        or args.stats
+        or args.index
+        or args.csv
+        or selects_rows(args)
+    ):
+        parser.error(
+            "--follow cannot be combined with -t, -r, --stream, --sample, --max-memory, "
+            "--stats, --index, --csv, --head, --tail or --rows"
+        )
+    if args.emit:
+        if (
+            args.style
+            or args.remove
+            or args.stream
+            or args.sample
+            or args.follow
+            or args.max_memory is not None
+            or args.stats
+            or args.index
+        ):
+            parser.error(
+                "--emit cannot be combined with -s, -r, --stream, --sample, --follow, "
+                "--max-memory, --stats or --index"
+            )
+        paths = [path for _, path in args.emit]
+        if len(set(paths)) < len(paths):
+            parser.error("each --emit target needs its own path")
+    if args.rows_index is not None and args.rows is None:
+        parser.error("--rows-index only applies to --rows")
+    if selects_rows(args) and (
+        args.remove or args.stream or args.sample or args.max_memory is not None or args.index
+    ):
+        parser.error(
+            "--head, --tail and --rows cannot be combined with -r, --stream, --sample, "
+            "--max-memory or --index"
+        )
+    if args.index is not None:
+        if args.transpose or args.remove or args.stream or args.sample or args.stats:
+            parser.error("--index cannot be combined with -t, -r, --stream, --sample or --stats")
+        if args.input == "-":
+            parser.error("--index needs an input file, not standard input")
+    parallel = (
+        not args.csv
+        and not args.emit
+        and not args.follow
+        and args.index is None
+        and not args.stats
+        and not selects_rows(args)
+        and args.jobs > 1
+        and not (args.transpose or args.sample)
+        and is_plain_file(args.input)
+    )
+    try:
+        out = open_output(args.stdout, buffer_size=args.output_buffer, compression=args.compress)
+    except ValueError as exc:
+        parser.error(f"--compress: {exc}")
+    try:
+        try:
+            render_single(args, out, parallel=parallel)
+        finally:
+            if args.compress:
+                out.close()
+                args.stdout.flush()
+            else:
+                out.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. ``| head``): stop rendering quietly.
+        if args.stdout is sys.stdout:
+            silence_stdout()
+        return 1
     except Exception as exc:  # noqa: BLE001
-        parser.print_usage(file=sys.stderr)
-        print(f"error: {exc}", file=sys.stderr)
+        parser.print_usage(file=args.stderr)
+        print(f"error: {exc}", file=args.stderr)
         return 1
-    print(table)
     return 0
 
 
@@ -0,0 +1,155 @@
+"""Columnar, dictionary-encoded storage for parsed tables.
+
+Each column keeps its distinct values once, in a small dictionary, and stores
+one integer code per row in an ``array`` whose item size grows only when the
+dictionary outgrows it. Code 0 is always the empty string, so padding a ragged
+row costs one code per missing cell and no string objects. Widths are measured
+once per distinct value, in batches when they are first needed, and padding is
+likewise done once per distinct value.
+"""
+
+from __future__ import annotations
+
+from array import array
+
+from .width import measure_widths
+
+# Annotation-only imports; collections.abc is not needed at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+# Tables with at least this many cells reduce per-row widths with NumPy, when
+# it is installed; below it the import costs more than it saves.
+VECTOR_MIN_CELLS = 1 << 18
+
+# Array typecodes in increasing item size, with the largest code each can hold.
+CODE_TYPES = (("B", 0xFF), ("H", 0xFFFF), ("L", 0xFFFFFFFF), ("Q", 0xFFFFFFFFFFFFFFFF))
+
+
+class Column:
+    __slots__ = ("values", "value_widths", "codes", "_width", "_index", "_code_limit")
+
+    def __init__(self, leading_blanks: int = 0) -> None:
+        self.values: list[str] = [""]
+        self.value_widths: list[int] = [0]
+        self._index: dict[str, int] = {"": 0}
+        typecode, self._code_limit = CODE_TYPES[0]
+        self.codes = array(typecode, bytes(leading_blanks))
+        self._width = 0
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def append(self, cell: str) -> None:
+        code = self._index.get(cell)
+        if code is None:
+            code = len(self.values)
+            self.values.append(cell)
+            self._index[cell] = code
+            if code > self._code_limit:
+                self._widen(code)
+        self.codes.append(code)
+
+    def append_blanks(self, count: int) -> None:
+        self.codes.frombytes(bytes(count * self.codes.itemsize))
+
+    def measure(self) -> None:
+        """Measure the values added since the last call, in one batch."""
+        measured = len(self.value_widths)
+        if measured < len(self.values):
+            new_widths = measure_widths(self.values[measured:])
+            self.value_widths.extend(new_widths)
+            self._width = max(self._width, max(new_widths))
+
+    @property
+    def width(self) -> int:
+        self.measure()
+        return self._width
+
+    def cells(self) -> Iterator[str]:
+        return map(self.values.__getitem__, self.codes)
+
+    def cell_widths(self) -> Iterator[int]:
+        self.measure()
+        return map(self.value_widths.__getitem__, self.codes)
+
+    def padded_cells(self, width: int) -> Iterator[str]:
+        """Yield each cell padded to ``width``, padding every distinct value once."""
+        self.measure()
+        padded = [
+            value.ljust(width - value_width + len(value))
+            for value, value_width in zip(self.values, self.value_widths)
+        ]
+        return map(padded.__getitem__, self.codes)
+
+    def _widen(self, code: int) -> None:
+        for typecode, limit in CODE_TYPES:
+            if code <= limit:
+                self.codes = array(typecode, self.codes)
+                self._code_limit = limit
+                return
+
+
+class ColumnarTable:
+    """A table held column by column; see the module docstring for the layout.
+
+    Rows are never stored as lists: ``iter_rows`` and ``iter_columns`` decode
+    one row (or one column, for transposed output) at a time.
+    """
+
+    __slots__ = ("columns", "row_count")
+
+    def __init__(self) -> None:
+        self.columns: list[Column] = []
+        self.row_count = 0
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[str]]) -> ColumnarTable:
+        table = cls()
+        for row in rows:
+            table.append_row(row)
+        return table
+
+    def append_row(self, cells: Sequence[str]) -> None:
+        columns = self.columns
+        while len(columns) < len(cells):
+            columns.append(Column(leading_blanks=self.row_count))
+        for column, cell in zip(columns, cells):
+            column.append(cell)
+        for column in columns[len(cells):]:
+            column.codes.append(0)
+        self.row_count += 1
+
+    def widths(self) -> list[int]:
+        """Return the display width of each column."""
+        return [column.width for column in self.columns]
+
+    def has_line_breaks(self) -> bool:
+        """Tell whether any cell spans several lines (a multi-line CSV field)."""
+        return any("\n" in value for column in self.columns for value in column.values)
+
+    def row_widths(self) -> list[int]:
+        """Return the widest cell of each row, i.e. the widths once transposed."""
+        if self.row_count * len(self.columns) >= VECTOR_MIN_CELLS:
+            from .vectorized import numpy_row_widths
+
+            widths = numpy_row_widths(self.columns)
+            if widths is not None:
+                return widths
+        widths = [0] * self.row_count
+        for column in self.columns:
+            widths = list(map(max, widths, column.cell_widths()))
+        return widths
+
+    def iter_rows(self) -> Iterator[tuple[str, ...]]:
+        return zip(*(column.cells() for column in self.columns))
+
+    def iter_padded_rows(self, widths: Sequence[int]) -> Iterator[tuple[str, ...]]:
+        """Like ``iter_rows`` but with every cell already padded to its column width."""
+        return zip(*(column.padded_cells(width) for column, width in zip(self.columns, widths)))
+
+    def iter_columns(self) -> Iterator[list[str]]:
+        """Yield the table transposed: one list per column, top to bottom."""
+        for column in self.columns:
+            yield list(column.cells())
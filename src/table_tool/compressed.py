@@ -0,0 +1,227 @@
+"""Transparent decompression of inputs and compression of outputs.
+
+Compressed inputs are recognised by their magic bytes, not their names, so
+``export.txt`` holding gzip data and ``data.gz`` holding plain text are both
+read correctly. Files are sniffed by reading their first bytes; standard input
+(and other buffered streams) by peeking, which leaves the bytes in place for
+the plain text path.
+
+A compressed input is decompressed as it is read, never to disk. When more
+than one CPU is available, a background thread reads decompressed blocks up
+to ``QUEUE_DEPTH`` blocks ahead of the consumer; zlib, bz2 and lzma release
+the GIL while they work, so decompression overlaps with parsing and
+rendering. On a single CPU the thread would only add switching, so the
+blocks are read in line. The blocks are split into lines at newline
+boundaries and decoded by ``table_tool.inputs.decode_lines``, so a compressed
+file splits exactly like a plain file, and compressed standard input exactly
+like plain standard input.
+
+zstd needs Python 3.14's ``compression.zstd`` or the ``zstandard`` package;
+gzip, bzip2 and xz only need the standard library.
+"""
+
+from __future__ import annotations
+
+import os
+
+from .inputs import MAP_BLOCK_SIZE, decode_lines
+
+# Annotation-only imports; the typing module is not needed at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from typing import BinaryIO
+
+COMPRESSIONS = ("gz", "bz2", "xz", "zst")
+MAGIC_NUMBERS = {
+    "gz": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+    "zst": b"\x28\xb5\x2f\xfd",
+}
+SNIFF_SIZE = max(map(len, MAGIC_NUMBERS.values()))
+# Decompressed blocks the background thread may read ahead of the consumer.
+QUEUE_DEPTH = 4
+PUT_TIMEOUT = 0.1
+
+
+def detect_compression(head: bytes) -> str | None:
+    """Return the compression whose magic bytes start ``head``, or None."""
+    for compression, magic in MAGIC_NUMBERS.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def file_compression(path: str) -> str | None:
+    """Return the compression of the file at ``path``, or None if it is plain."""
+    with open(path, "rb") as handle:
+        return detect_compression(handle.read(SNIFF_SIZE))
+
+
+def stream_compression(stream: BinaryIO | None) -> str | None:
+    """Peek at a buffered binary stream and return its compression, or None.
+
+    Nothing is consumed. Streams that cannot peek are taken as plain.
+    """
+    peek = getattr(stream, "peek", None)
+    if peek is None:
+        return None
+    return detect_compression(peek(SNIFF_SIZE)[:SNIFF_SIZE])
+
+
+def open_compressed(raw: BinaryIO, compression: str, mode: str = "rb") -> BinaryIO:
+    """Wrap the binary stream ``raw`` to decompress (``rb``) or compress (``wb``) it.
+
+    Closing the wrapper finishes the compressed stream but leaves ``raw`` open.
+    """
+    if compression == "gz":
+        import gzip
+
+        # An empty name keeps "<stdout>" out of the gzip header.
+        return gzip.GzipFile(filename="", mode=mode, fileobj=raw, compresslevel=6)
+    if compression == "bz2":
+        import bz2
+
+        return bz2.BZ2File(raw, mode)
+    if compression == "xz":
+        import lzma
+
+        return lzma.LZMAFile(raw, mode)
+    if compression == "zst":
+        return open_zstd(raw, mode)
+    raise ValueError(f"unknown compression '{compression}'")
+
+
+def open_zstd(raw: BinaryIO, mode: str) -> BinaryIO:
+    try:
+        from compression import zstd
+    except ImportError:
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError(
+                "zstd needs Python 3.14 or the zstandard package (pip install zstandard)"
+            ) from None
+        if mode == "rb":
+            return zstandard.ZstdDecompressor().stream_reader(
+                raw, read_across_frames=True, closefd=False
+            )
+        return zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+    return zstd.ZstdFile(raw, mode[0])
+
+
+def can_read_ahead() -> bool:
+    """Tell whether a background reader would get a CPU of its own."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) > 1
+    return (os.cpu_count() or 1) > 1
+
+
+def read_blocks(stream: BinaryIO, compression: str, block_size: int) -> Iterator[bytes]:
+    """Yield decompressed blocks of ``stream``; corrupt data raises ValueError."""
+    while True:
+        try:
+            block = stream.read(block_size)
+        except Exception as exc:  # noqa: BLE001 - zlib, bz2 and lzma raise their own types
+            raise ValueError(f"cannot decompress the {compression} input: {exc}") from exc
+        if not block:
+            return
+        yield block
+
+
+def read_ahead(blocks: Iterator[bytes], *, depth: int = QUEUE_DEPTH) -> Iterator[bytes]:
+    """Yield ``blocks`` as a background thread produces them, ``depth`` at most ahead.
+
+    An exception in the thread is raised here. Closing the generator stops the
+    thread once its current block is done.
+    """
+    import queue
+    import threading
+
+    pending: queue.Queue[bytes | Exception | None] = queue.Queue(depth)
+    stop = threading.Event()
+
+    def put(item: bytes | Exception | None) -> bool:
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=PUT_TIMEOUT)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def produce() -> None:
+        try:
+            for block in blocks:
+                if not put(block):
+                    return
+        except Exception as exc:  # noqa: BLE001 - re-raised in the consumer
+            put(exc)
+            return
+        put(None)
+
+    thread = threading.Thread(target=produce, name="table_tool-decompress", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def iter_block_lines(blocks: Iterable[bytes], *, split_lines: bool = True) -> Iterator[str]:
+    """Decode UTF-8 blocks into lines, cutting only after newlines.
+
+    With ``split_lines`` the lines are split as a file, otherwise as a stream
+    (see ``table_tool.inputs.decode_lines``).
+    """
+    pending = b""
+    for block in blocks:
+        pending += block
+        cut = pending.rfind(b"\n") + 1
+        if cut:
+            yield from decode_lines(pending[:cut], stream=not split_lines)
+            pending = pending[cut:]
+    if pending:
+        yield from decode_lines(pending, stream=not split_lines)
+
+
+def iter_decompressed_lines(
+    raw: BinaryIO,
+    compression: str,
+    *,
+    split_lines: bool = True,
+    background: bool | None = None,
+    block_size: int = MAP_BLOCK_SIZE,
+) -> Iterator[str]:
+    """Yield the lines of the compressed stream ``raw``; see the module docstring.
+
+    ``background`` forces the background reader on or off; by default it is
+    used when ``can_read_ahead`` says so.
+    """
+    with open_compressed(raw, compression) as stream:
+        blocks = read_blocks(stream, compression, block_size)
+        if background is None:
+            background = can_read_ahead()
+        if background:
+            blocks = read_ahead(blocks)
+        try:
+            yield from iter_block_lines(blocks, split_lines=split_lines)
+        finally:
+            # Stop the reader thread before the stream it reads is closed.
+            blocks.close()
+
+
+def iter_compressed_file(
+    path: str, compression: str, *, background: bool | None = None
+) -> Iterator[str]:
+    """Yield the lines of the compressed file at ``path``."""
+    with open(path, "rb") as raw:
+        yield from iter_decompressed_lines(raw, compression, background=background)
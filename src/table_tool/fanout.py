@@ -0,0 +1,290 @@
+"""Several output formats from one parse, for ``--emit FORMAT:PATH``.
+
+The input is parsed once into a ``ColumnarTable`` and its column widths are
+measured once. The rows are then decoded in a single pass, and each row is
+handed to every output in turn, so the outputs are written side by side
+instead of one after the other. The formats are:
+
+* ``t``, ``m``, ``g``: the bordered table styles, with ``-b`` as usual;
+* ``x``: the borderless layout of ``-b x``;
+* ``delimited``: cells joined with the input delimiter, as ``-r`` writes them;
+* ``tsv``: cells joined with tabs; tabs and line breaks inside a cell become
+  spaces;
+* ``markdown``: a GitHub-style pipe table whose first row is the header;
+* ``html``: a ``<table>`` whose first row is the ``<thead>``.
+
+The table formats produce exactly what a plain run with the same options
+would; the first row is only special in ``markdown`` and ``html``.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from contextlib import ExitStack, contextmanager, nullcontext
+
+from .columnar import ColumnarTable
+from .output import BufferedTextWriter
+from .render import RenderPlan, cap_widths, layout_overflow, pad_cell, row_parser
+from .width import measure_widths
+
+# Annotation-only imports; the typing module is not needed at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+EMIT_FORMATS = ("t", "m", "g", "x", "delimited", "tsv", "markdown", "html")
+MARKDOWN_MIN_WIDTH = 3
+
+
+class Emitter(ABC):
+    """Writes one output format: ``start``, then ``row`` once per row in order, then ``finish``."""
+
+    __slots__ = ("out",)
+
+    def __init__(self, out: BufferedTextWriter) -> None:
+        self.out = out
+
+    def start(self, row_count: int) -> None:
+        pass
+
+    @abstractmethod
+    def row(self, index: int, cells: Sequence[str], padded: Sequence[str] | None) -> None:
+        """Write the 1-based row ``index``; ``padded`` holds the cells padded to width, if known."""
+
+    def finish(self) -> None:
+        pass
+
+
+class TableEmitter(Emitter):
+    __slots__ = ("plan", "row_count")
+
+    def __init__(self, out: BufferedTextWriter, plan: RenderPlan) -> None:
+        super().__init__(out)
+        self.plan = plan
+        self.row_count = 0
+
+    def start(self, row_count: int) -> None:
+        self.row_count = row_count
+        top = self.plan.borders.get("top")
+        if top is not None:
+            self.out.write_lines((top,))
+
+    def row(self, index: int, cells: Sequence[str], padded: Sequence[str] | None) -> None:
+        plan = self.plan
+        if padded is not None:
+            self.out.write_lines((plan.format_padded_row(padded),))
+        else:
+            self.out.write_lines(plan.row_lines(cells))
+        border = plan.border_after(index, index == self.row_count)
+        if border is not None:
+            self.out.write_lines((border,))
+
+
+class DelimitedEmitter(Emitter):
+    __slots__ = ("delimiter", "clean")
+
+    def __init__(self, out: BufferedTextWriter, delimiter: str, *, clean: bool = False) -> None:
+        super().__init__(out)
+        self.delimiter = delimiter
+        self.clean = clean
+
+    def row(self, index: int, cells: Sequence[str], padded: Sequence[str] | None) -> None:
+        if self.clean:
+            cells = [tsv_cell(cell) for cell in cells]
+        self.out.write_lines((self.delimiter.join(cells),))
+
+
+class MarkdownEmitter(Emitter):
+    """Writes a pipe table; ``widths`` must be measured on the escaped cells."""
+
+    __slots__ = ("widths",)
+
+    def __init__(self, out: BufferedTextWriter, widths: Sequence[int]) -> None:
+        super().__init__(out)
+        self.widths = [max(width, MARKDOWN_MIN_WIDTH) for width in widths]
+
+    def row(self, index: int, cells: Sequence[str], padded: Sequence[str] | None) -> None:
+        cells = [pad_cell(markdown_cell(cell), width) for cell, width in zip(cells, self.widths)]
+        lines = ["| " + " | ".join(cells) + " |"]
+        if index == 1:
+            lines.append("| " + " | ".join("-" * width for width in self.widths) + " |")
+        self.out.write_lines(lines)
+
+
+class HtmlEmitter(Emitter):
+    __slots__ = ()
+
+    def start(self, row_count: int) -> None:
+        self.out.write_lines(("<table>", "<thead>"))
+
+    def row(self, index: int, cells: Sequence[str], padded: Sequence[str] | None) -> None:
+        tag = "th" if index == 1 else "td"
+        line = "".join(f"<{tag}>{html_cell(cell)}</{tag}>" for cell in cells)
+        self.out.write_lines((f"<tr>{line}</tr>",))
+        if index == 1:
+            self.out.write_lines(("</thead>", "<tbody>"))
+
+    def finish(self) -> None:
+        self.out.write_lines(("</tbody>", "</table>"))
+
+
+def tsv_cell(cell: str) -> str:
+    return cell.replace("\t", " ").replace("\r\n", " ").replace("\n", " ")
+
+
+def markdown_cell(cell: str) -> str:
+    return cell.replace("\\", "\\\\").replace("|", "\\|").replace("\n", "<br>")
+
+
+def markdown_widths(stored: ColumnarTable, *, transpose: bool) -> list[int]:
+    """Return the column widths of the markdown output, measured on the escaped cells.
+
+    Escaping adds characters (``\\|``, ``\\\\``, ``<br>``), so the widths of the
+    raw cells are too narrow. Each distinct value is escaped and measured once.
+    """
+    value_widths = [
+        measure_widths([markdown_cell(value) for value in column.values])
+        for column in stored.columns
+    ]
+    if not transpose:
+        return [max(column_widths) for column_widths in value_widths]
+    widths = [0] * stored.row_count
+    for column, column_widths in zip(stored.columns, value_widths):
+        widths = list(map(max, widths, map(column_widths.__getitem__, column.codes)))
+    return widths
+
+
+def html_cell(cell: str) -> str:
+    from html import escape
+
+    return escape(cell, quote=False).replace("\n", "<br>")
+
+
+def make_emitter(
+    format: str,
+    out: BufferedTextWriter,
+    *,
+    widths: Sequence[int],
+    delimiter: str,
+    thick_border_interval: int | str,
+    overflow: str | None,
+) -> Emitter:
+    if format in ("t", "m", "g", "x"):
+        plan = RenderPlan(
+            widths,
+            style="t" if format == "x" else format,
+            thick_border_interval="x" if format == "x" else thick_border_interval,
+            overflow=overflow,
+        )
+        return TableEmitter(out, plan)
+    if format == "delimited":
+        return DelimitedEmitter(out, delimiter)
+    if format == "tsv":
+        return DelimitedEmitter(out, "\t", clean=True)
+    if format == "markdown":
+        return MarkdownEmitter(out, widths)
+    if format == "html":
+        return HtmlEmitter(out)
+    raise ValueError(f"unknown output format '{format}'")
+
+
+def emit_text(
+    lines: Iterable[str],
+    targets: Sequence[tuple[str, str]],
+    *,
+    out: BufferedTextWriter | None = None,
+    compression: str | None = None,
+    delimiter: str = "|",
+    thick_border_interval: int | str = 3,
+    transpose: bool = False,
+    max_widths: Sequence[int] | None = None,
+    overflow: str = "truncate",
+    csv_quoting: bool = False,
+) -> None:
+    """Parse ``lines`` once and write every ``(format, path)`` target in one pass.
+
+    The path ``-`` writes to ``out``. Files are only opened once the input has
+    been parsed, so an input error leaves existing outputs untouched; with
+    ``compression`` each file is compressed (see ``table_tool.compressed``).
+    """
+    stored = ColumnarTable.from_rows(row_parser(csv_quoting)(lines, delimiter=delimiter))
+    if not stored.row_count:
+        raise ValueError("no rows found in the input")
+    plan_overflow = layout_overflow(
+        stored, max_widths=max_widths, overflow=overflow, csv_quoting=csv_quoting
+    )
+    widths = cap_widths(stored.row_widths() if transpose else stored.widths(), max_widths)
+    with ExitStack() as stack:
+        emitters = []
+        for format, path in targets:
+            target = out if path == "-" else stack.enter_context(open_file(path, compression))
+            assert target is not None
+            emitters.append(
+                make_emitter(
+                    format,
+                    target,
+                    widths=(
+                        markdown_widths(stored, transpose=transpose)
+                        if format == "markdown"
+                        else widths
+                    ),
+                    delimiter=delimiter,
+                    thick_border_interval=thick_border_interval,
+                    overflow=plan_overflow,
+                )
+            )
+        write_rows(
+            stored, emitters, widths=widths, transpose=transpose, padded=plan_overflow is None
+        )
+
+
+def write_rows(
+    stored: ColumnarTable,
+    emitters: Sequence[Emitter],
+    *,
+    widths: Sequence[int],
+    transpose: bool,
+    padded: bool,
+) -> None:
+    """Decode the rows once and pass each one to every emitter."""
+    if transpose:
+        rows: Iterable[Sequence[str]] = stored.iter_columns()
+        count = len(stored.columns)
+        padded = False
+    else:
+        rows = stored.iter_rows()
+        count = stored.row_count
+    # Pad each distinct value once, as the plain render does, if a table needs it.
+    padded_rows = (
+        stored.iter_padded_rows(widths)
+        if padded and any(isinstance(emitter, TableEmitter) for emitter in emitters)
+        else None
+    )
+    for emitter in emitters:
+        emitter.start(count)
+    if padded_rows is None:
+        for index, cells in enumerate(rows, 1):
+            for emitter in emitters:
+                emitter.row(index, cells, None)
+    else:
+        for index, (cells, padded_cells) in enumerate(zip(rows, padded_rows), 1):
+            for emitter in emitters:
+                emitter.row(index, cells, padded_cells)
+    for emitter in emitters:
+        emitter.finish()
+
+
+@contextmanager
+def open_file(path: str, compression: str | None) -> Iterator[BufferedTextWriter]:
+    """Open a ``BufferedTextWriter`` over a new file at ``path``, flushed on success."""
+    with open(path, "wb") as raw:
+        if compression is None:
+            sink = nullcontext(raw)
+        else:
+            from .compressed import open_compressed
+
+            sink = open_compressed(raw, compression, "wb")
+        with sink as stream:
+            writer = BufferedTextWriter(stream)
+            yield writer
+            writer.flush()
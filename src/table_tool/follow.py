@@ -0,0 +1,330 @@
+"""Live rendering of a growing input for ``--follow``.
+
+The input (a file, or standard input) is kept open and read as it grows, like
+``tail -f``. Column widths are kept as running maxima, and every new row is
+written as soon as it has been read while it still fits the current layout;
+its separator border is written once the next row arrives (or the bottom
+border, when the input ends), so a finished table looks like a normal render.
+
+When a row is wider than its column, or has more columns, one of two things
+happens:
+
+* ``relayout``: the row is shown with its cells cut or wrapped (as with
+  ``--max-width``) and the whole table is redrawn with the new widths once
+  ``relayout_interval`` seconds have passed since the last layout. On a
+  terminal the screen is cleared first; otherwise the current table is closed
+  and the redrawn one follows it. Only the rows, kept column by column, are
+  held in memory, and however fast lines arrive the table is redrawn at most
+  once per interval.
+* ``mark``: the widths of the first batch of rows are kept, and over-wide
+  cells are always cut or wrapped. No rows are kept in memory.
+
+Pipes and terminals are waited on with ``selectors``. A regular file cannot
+signal growth that way, so at its end the file is checked again every
+``poll_interval`` seconds. Following stops when a pipe is closed, or on
+Ctrl-C. At that point any last line without a newline is rendered, the
+pending layout is applied and the closing border is written.
+"""
+
+from __future__ import annotations
+
+import os
+import selectors
+import stat
+import sys
+import time
+
+from .columnar import ColumnarTable
+from .inputs import decode_lines
+from .render import RenderPlan, cap_widths, column_widths, fold_rows, iter_rows
+from .width import display_width
+
+# Annotation-only imports; the typing module is not needed at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Sequence
+    from typing import TextIO
+
+ON_WIDEN_MODES = ("relayout", "mark")
+READ_SIZE = 1 << 16
+# Read at most this much of a busy pipe before rendering what has arrived.
+BATCH_LIMIT = 1 << 20
+POLL_INTERVAL = 0.25
+CLEAR_SCREEN = "\x1b[H\x1b[2J\x1b[3J"
+
+
+class FollowedTable:
+    """Renders rows as they arrive; see the module docstring.
+
+    Call ``feed`` with each batch of new lines, ``tick`` when no input arrived
+    before ``seconds_until_relayout`` ran out, and ``close`` at the end.
+    """
+
+    __slots__ = (
+        "out",
+        "delimiter",
+        "thick_border_interval",
+        "style",
+        "max_widths",
+        "overflow",
+        "relayout",
+        "relayout_interval",
+        "clear_screen",
+        "clock",
+        "plan",
+        "running",
+        "rows",
+        "row_count",
+        "stale",
+        "laid_out_at",
+    )
+
+    def __init__(
+        self,
+        out: TextIO,
+        *,
+        delimiter: str = "|",
+        thick_border_interval: int | str = 3,
+        style: str = "t",
+        max_widths: Sequence[int] | None = None,
+        overflow: str = "truncate",
+        on_widen: str = "relayout",
+        relayout_interval: float = 1.0,
+        clear_screen: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.out = out
+        self.delimiter = delimiter
+        self.thick_border_interval = thick_border_interval
+        self.style = style
+        self.max_widths = max_widths
+        self.overflow = overflow
+        self.relayout = on_widen == "relayout"
+        self.relayout_interval = relayout_interval
+        self.clear_screen = clear_screen
+        self.clock = clock
+        self.plan: RenderPlan | None = None
+        self.running: list[int] = []
+        self.rows = ColumnarTable() if self.relayout else None
+        self.row_count = 0
+        self.stale = False
+        self.laid_out_at = 0.0
+
+    def feed(self, lines: Sequence[str]) -> None:
+        """Render the rows in ``lines``; the first batch fixes the initial widths."""
+        rows = iter_rows(lines, delimiter=self.delimiter)
+        if self.plan is None:
+            first = list(rows)
+            if not first:
+                return
+            self.running = column_widths(first)
+            if self.rows is not None:
+                for row in first:
+                    self.rows.append_row(row)
+            self._lay_out(first)
+            return
+        for row in rows:
+            if self.rows is not None:
+                self.rows.append_row(row)
+            if self.relayout and self._widens(row):
+                self.stale = True
+                if self.seconds_until_relayout() == 0:
+                    self._redraw()
+                    continue
+            self._write_row(row)
+
+    def seconds_until_relayout(self) -> float | None:
+        """Return how long until a pending re-layout is due, or None if none is."""
+        if not self.stale:
+            return None
+        return max(0.0, self.laid_out_at + self.relayout_interval - self.clock())
+
+    def tick(self) -> None:
+        """Redraw the table if a re-layout is pending and due."""
+        if self.seconds_until_relayout() == 0:
+            self._redraw()
+
+    def close(self) -> None:
+        """Apply any pending re-layout and write the closing border."""
+        if self.plan is None:
+            return
+        if self.stale:
+            self._redraw()
+        self._write_closing()
+
+    def _widens(self, row: Sequence[str]) -> bool:
+        running = self.running
+        grew = False
+        for idx, cell in enumerate(row):
+            cell_width = display_width(cell)
+            if idx == len(running):
+                running.append(cell_width)
+                grew = True
+            elif cell_width > running[idx]:
+                running[idx] = cell_width
+                grew = True
+        assert self.plan is not None
+        return grew and tuple(cap_widths(running, self.max_widths)) != self.plan.widths
+
+    def _lay_out(self, rows: Iterable[Sequence[str]]) -> None:
+        self.plan = RenderPlan(
+            cap_widths(self.running, self.max_widths),
+            style=self.style,
+            thick_border_interval=self.thick_border_interval,
+            overflow=self.overflow,
+        )
+        self.row_count = 0
+        self.stale = False
+        self.laid_out_at = self.clock()
+        for row in rows:
+            self._write_row(row)
+
+    def _redraw(self) -> None:
+        if self.clear_screen:
+            self.out.write(CLEAR_SCREEN)
+        else:
+            self._write_closing()
+        assert self.rows is not None
+        self._lay_out(self.rows.iter_rows())
+
+    def _write_row(self, row: Sequence[str]) -> None:
+        plan = self.plan
+        assert plan is not None
+        if self.row_count:
+            border = plan.border_after(self.row_count, False)
+        else:
+            border = plan.borders.get("top")
+        if border is not None:
+            self.out.write(border)
+            self.out.write("\n")
+        self.row_count += 1
+        (row,) = fold_rows([list(row)], len(plan.widths), self.delimiter)
+        for line in plan.row_lines(row):
+            self.out.write(line)
+            self.out.write("\n")
+
+    def _write_closing(self) -> None:
+        assert self.plan is not None
+        if self.row_count:
+            border = self.plan.border_after(self.row_count, True)
+            if border is not None:
+                self.out.write(border)
+                self.out.write("\n")
+
+
+def split_lines(data: bytes, partial: bytes, *, stream: bool) -> tuple[list[str], bytes]:
+    """Return the complete lines of ``partial`` followed by ``data``, and the rest.
+
+    Empty ``data`` marks the end of the input, where the rest is a line too.
+    Lines are decoded as a file or a ``stream`` (see ``inputs.decode_lines``).
+    """
+    pending = partial + data
+    cut = pending.rfind(b"\n") + 1 if data else len(pending)
+    return decode_lines(pending[:cut], stream=stream), pending[cut:]
+
+
+def follow_table(
+    source: str,
+    out: TextIO,
+    *,
+    stdin: TextIO | None = None,
+    clear_screen: bool | None = None,
+    poll_interval: float = POLL_INTERVAL,
+    **options: object,
+) -> None:
+    """Follow ``source`` (a path, or ``-`` for ``stdin``) and render it to ``out``.
+
+    ``options`` are passed to ``FollowedTable``; ``out`` is flushed after every
+    batch of rows. ``stdin`` defaults to ``sys.stdin``, and ``clear_screen`` to
+    whether ``sys.stdout`` is a terminal.
+    """
+    if clear_screen is None:
+        clear_screen = out_is_terminal()
+    if source == "-":
+        fd = (sys.stdin if stdin is None else stdin).fileno()
+        owned = False
+    else:
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"input file '{source}' does not exist")
+        fd = os.open(source, os.O_RDONLY)
+        owned = True
+    table = FollowedTable(out, clear_screen=clear_screen, **options)
+    partial = b""
+    regular = stat.S_ISREG(os.fstat(fd).st_mode)
+    # Standard input is split as a stream, like the other modes read it.
+    stream = source == "-"
+    selector = None
+    try:
+        if not regular:
+            selector = selectors.DefaultSelector()
+            selector.register(fd, selectors.EVENT_READ)
+        while True:
+            if regular:
+                data = read_available_file(fd)
+            else:
+                assert selector is not None
+                if not selector.select(table.seconds_until_relayout()):
+                    table.tick()
+                    out.flush()
+                    continue
+                data = read_available_pipe(fd, selector)
+            if not data:
+                if not regular:
+                    break
+                table.tick()
+                out.flush()
+                wait = table.seconds_until_relayout()
+                time.sleep(poll_interval if wait is None else min(wait, poll_interval))
+                continue
+            lines, partial = split_lines(data, partial, stream=stream)
+            table.feed(lines)
+            out.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if selector is not None:
+            selector.close()
+        if owned:
+            os.close(fd)
+    # A last line without a newline is rendered once following stops.
+    lines, partial = split_lines(b"", partial, stream=stream)
+    table.feed(lines)
+    if table.plan is None:
+        raise ValueError("no rows found in the input")
+    table.close()
+
+
+def read_available_file(fd: int) -> bytes:
+    """Read a regular file up to its current end; b"" if it has not grown."""
+    position = os.lseek(fd, 0, os.SEEK_CUR)
+    if os.fstat(fd).st_size < position:
+        raise ValueError("the input file was truncated while following it")
+    chunks = []
+    while True:
+        chunk = os.read(fd, READ_SIZE)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+def read_available_pipe(fd: int, selector: selectors.BaseSelector) -> bytes:
+    """Read what a readable pipe holds, up to ``BATCH_LIMIT``; b"" at its end."""
+    chunks = []
+    size = 0
+    while size < BATCH_LIMIT:
+        chunk = os.read(fd, READ_SIZE)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+        if not selector.select(0):
+            break
+    return b"".join(chunks)
+
+
+def out_is_terminal(stream: TextIO | None = None) -> bool:
+    """Tell whether ``stream`` (by default ``sys.stdout``) is a terminal."""
+    try:
+        return os.isatty((sys.stdout if stream is None else stream).fileno())
+    except (AttributeError, OSError, ValueError):
+        return False
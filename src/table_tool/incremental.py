@@ -0,0 +1,272 @@
+"""Incremental re-rendering of append-only inputs through a sidecar index.
+
+The index file holds the rendered table without its closing border, followed
+by one JSON trailer line recording the render options, how many input bytes
+have been processed (with checksums of the input up to that point), the
+measured column widths and the row count.
+
+When the input has only grown since the index was written, just the appended
+bytes are parsed. If none of the new cells is wider than its column, the
+cached lines are copied out unchanged and the new rows are rendered after
+them, numbered on from the cached rows so thick borders fall exactly where a
+full render would put them; the new lines are then appended to the index in
+place. Otherwise, or when the index does not match the input or the options,
+the table is rendered from scratch and the index rewritten.
+
+The index is only saved when the input ends with a newline, since a partial
+last line may still be growing.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import os
+import zlib
+
+from .inputs import iter_mapped_lines
+from .columnar import ColumnarTable
+from .render import RenderPlan, cap_widths, column_widths, iter_rows, padded_rows
+
+# Annotation-only imports; the typing module is not needed at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+    from typing import BinaryIO, TextIO
+
+INDEX_VERSION = 1
+CHECK_SPAN = 1 << 16
+COPY_BLOCK = 1 << 20
+
+
+def input_checksums(handle: BinaryIO, offset: int) -> list[int]:
+    """Checksum the first and the last ``CHECK_SPAN`` bytes before ``offset``.
+
+    This catches an input that was rewritten or truncated and regrown rather
+    than appended to, without reading all of it.
+    """
+    handle.seek(0)
+    head = zlib.crc32(handle.read(min(offset, CHECK_SPAN)))
+    tail_start = max(0, offset - CHECK_SPAN)
+    handle.seek(tail_start)
+    tail = zlib.crc32(handle.read(offset - tail_start))
+    return [head, tail]
+
+
+def ends_with_newline(handle: BinaryIO, size: int) -> bool:
+    if not size:
+        return False
+    handle.seek(size - 1)
+    return handle.read(1) == b"\n"
+
+
+def load_index(index_path: str) -> tuple[dict[str, object], int] | None:
+    """Return the trailer of an index and the byte length of its cached body.
+
+    A missing, truncated or unreadable index yields None, so the caller falls
+    back to a full render.
+    """
+    try:
+        with open(index_path, "rb") as index:
+            size = index.seek(0, os.SEEK_END)
+            position = size - 1
+            while position > 0:
+                start = max(0, position - CHECK_SPAN)
+                index.seek(start)
+                newline = index.read(position - start).rfind(b"\n")
+                if newline >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+            index.seek(position)
+            trailer = json.loads(index.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(trailer, dict) or trailer.get("version") != INDEX_VERSION:
+        return None
+    return trailer, position
+
+
+def copy_body(index_path: str, body_bytes: int, out: TextIO) -> None:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with open(index_path, "rb") as index:
+        remaining = body_bytes
+        while remaining:
+            chunk = index.read(min(remaining, COPY_BLOCK))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            out.write(decoder.decode(chunk))
+    out.write(decoder.decode(b"", final=True))
+
+
+def encode_lines(lines: Iterable[str]) -> bytes:
+    return "".join(f"{line}\n" for line in lines).encode("utf-8")
+
+
+def build_trailer(
+    options: dict[str, object],
+    offset: int,
+    checksums: list[int],
+    widths: Sequence[int],
+    row_count: int,
+) -> bytes:
+    trailer = {
+        "version": INDEX_VERSION,
+        "options": options,
+        "offset": offset,
+        "checksums": checksums,
+        "widths": list(widths),
+        "rows": row_count,
+    }
+    return json.dumps(trailer).encode("utf-8") + b"\n"
+
+
+def make_plan(widths: Sequence[int], options: dict[str, object]) -> RenderPlan:
+    max_widths = options["max_widths"]
+    return RenderPlan(
+        cap_widths(widths, max_widths),
+        style=options["style"],
+        thick_border_interval=options["thick_border_interval"],
+        overflow=options["overflow"] if max_widths else None,
+    )
+
+
+def extend_cached(
+    source: str,
+    handle: BinaryIO,
+    size: int,
+    index_path: str,
+    trailer: dict[str, object],
+    body_bytes: int,
+    out: TextIO,
+) -> bool:
+    """Write the cached table plus the appended rows; False if a width grew."""
+    options = trailer["options"]
+    offset = trailer["offset"]
+    widths = trailer["widths"]
+    row_count = trailer["rows"]
+    rows = list(iter_rows(iter_mapped_lines(source, offset, size), delimiter=options["delimiter"]))
+    new_widths = column_widths(rows)
+    if len(new_widths) > len(widths) or any(map(int.__gt__, new_widths, widths)):
+        return False
+
+    plan = make_plan(widths, options)
+    total = row_count + len(rows)
+    closing = plan.border_after(total, True)
+    added: list[str] = []
+    if rows:
+        separator = plan.border_after(row_count, False)
+        if separator is not None:
+            added.append(separator)
+        added.extend(
+            plan.iter_lines(padded_rows(rows, len(widths)), first_row=row_count + 1)
+        )
+        if closing is not None:
+            added.pop()
+
+    copy_body(index_path, body_bytes, out)
+    for line in added:
+        out.write(line)
+        out.write("\n")
+    if closing is not None:
+        out.write(closing)
+        out.write("\n")
+
+    if size > offset and ends_with_newline(handle, size):
+        with open(index_path, "r+b") as index:
+            index.seek(body_bytes)
+            index.write(encode_lines(added))
+            index.write(build_trailer(options, size, input_checksums(handle, size), widths, total))
+            index.truncate()
+    return True
+
+
+def render_full(
+    source: str,
+    handle: BinaryIO,
+    size: int,
+    index_path: str,
+    options: dict[str, object],
+    out: TextIO,
+) -> None:
+    """Render the whole input and rewrite the index next to the output."""
+    stored = ColumnarTable.from_rows(
+        iter_rows(iter_mapped_lines(source, 0, size), delimiter=options["delimiter"])
+    )
+    if not stored.row_count:
+        raise ValueError("no rows found in the input")
+    widths = stored.widths()
+    plan = make_plan(widths, options)
+    closing = plan.border_after(stored.row_count, True)
+    if not ends_with_newline(handle, size):
+        if os.path.exists(index_path):
+            os.unlink(index_path)
+        for line in plan.iter_lines(stored.iter_rows()):
+            out.write(line)
+            out.write("\n")
+        return
+
+    partial = f"{index_path}.partial"
+    try:
+        with open(partial, "wb") as index:
+            pending: str | None = None
+            for line in plan.iter_lines(stored.iter_rows()):
+                if pending is not None:
+                    index.write(pending.encode("utf-8") + b"\n")
+                out.write(line)
+                out.write("\n")
+                pending = line
+            if closing is None and pending is not None:
+                index.write(pending.encode("utf-8") + b"\n")
+            index.write(
+                build_trailer(
+                    options, size, input_checksums(handle, size), widths, stored.row_count
+                )
+            )
+        os.replace(partial, index_path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.unlink(partial)
+        raise
+
+
+def render_incremental(
+    source: str,
+    index_path: str,
+    out: TextIO,
+    *,
+    delimiter: str = "|",
+    thick_border_interval: int | str = 3,
+    style: str = "t",
+    max_widths: Sequence[int] | None = None,
+    overflow: str = "truncate",
+) -> bool:
+    """Render ``source`` to ``out`` through the index at ``index_path``.
+
+    The output is identical to the in-memory render. Returns True when the
+    cached output was reused and False after a full render.
+    """
+    options = {
+        "delimiter": delimiter,
+        "thick_border_interval": thick_border_interval,
+        "style": style,
+        "max_widths": list(max_widths) if max_widths else None,
+        "overflow": overflow,
+    }
+    with open(source, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        cached = load_index(index_path)
+        if cached is not None:
+            trailer, body_bytes = cached
+            offset = trailer.get("offset")
+            if (
+                trailer.get("options") == options
+                and isinstance(offset, int)
+                and offset <= size
+                and trailer.get("checksums") == input_checksums(handle, offset)
+                and extend_cached(source, handle, size, index_path, trailer, body_bytes, out)
+            ):
+                return True
+        render_full(source, handle, size, index_path, options, out)
+    return False
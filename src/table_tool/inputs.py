@@ -0,0 +1,184 @@
+"""Input sources: the lines of files and standard input.
+
+Regular files are read through a memory map, one newline-aligned block at a
+time; compressed inputs are decompressed as they are read (see
+``table_tool.compressed``). ``remove_table`` turns those lines back into
+delimited text for ``-r``. Everything that reads input -- the command line,
+batch mode, the parallel, slicing and incremental renderers -- imports it
+from here, so none of them needs ``table_tool.cli``.
+"""
+
+from __future__ import annotations
+
+import codecs
+import io
+import mmap
+import os
+import sys
+
+from .render import iter_table_rows, sniff_style
+
+# Annotation-only imports; the typing module is not needed at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+    from typing import TextIO
+
+MAP_BLOCK_SIZE = 1 << 20
+READ_SIZE = 1 << 16
+
+
+def load_lines(input_path: str, stdin: TextIO | None = None) -> Iterable[str]:
+    """Return the lines of ``input_path`` (or ``-`` for ``stdin``), decompressing if needed.
+
+    ``stdin`` defaults to ``sys.stdin``.
+    """
+    from .compressed import (
+        file_compression,
+        iter_compressed_file,
+        iter_decompressed_lines,
+        stream_compression,
+    )
+
+    if input_path == "-":
+        if stdin is None:
+            stdin = sys.stdin
+        buffer = getattr(stdin, "buffer", None)
+        compression = stream_compression(buffer)
+        if compression is None:
+            return stdin
+        return iter_decompressed_lines(buffer, compression, split_lines=False)
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"input file '{input_path}' does not exist")
+    if os.path.isfile(input_path):
+        compression = file_compression(input_path)
+        if compression is None:
+            return iter_mapped_lines(input_path)
+        return iter_compressed_file(input_path, compression)
+    with open(input_path, "rb") as handle:
+        compression = stream_compression(handle)
+        if compression is not None:
+            return list(iter_decompressed_lines(handle, compression))
+        return io.TextIOWrapper(handle, encoding="utf-8").read().splitlines(keepends=True)
+
+
+def load_line_batches(input_path: str, stdin: TextIO | None = None) -> Iterable[Iterable[str]]:
+    """Return the lines of ``load_lines`` in batches; see ``iter_stream_batches``.
+
+    Only plain standard input can make a reader wait, so every other input is
+    a single batch.
+    """
+    from .compressed import stream_compression
+
+    if input_path == "-":
+        if stdin is None:
+            stdin = sys.stdin
+        if stream_compression(getattr(stdin, "buffer", None)) is None:
+            return iter_stream_batches(stdin)
+    return (load_lines(input_path, stdin),)
+
+
+def iter_stream_batches(stream: TextIO) -> Iterator[Sequence[str]]:
+    """Yield the lines of a text stream in batches, one per read of what has arrived.
+
+    Only the read that starts a batch can wait for input, so a consumer that
+    has handled a batch has handled everything available so far. A UTF-8
+    stream is read through its binary buffer and split as a stream (see
+    ``decode_lines``); any other stream is yielded one line per batch.
+    """
+    read1 = getattr(getattr(stream, "buffer", None), "read1", None)
+    if read1 is None or codecs.lookup(stream.encoding or "ascii").name != "utf-8":
+        for line in stream:
+            yield (line,)
+        return
+    errors = stream.errors or "strict"
+    pending = b""
+    while chunk := read1(READ_SIZE):
+        pending += chunk
+        cut = pending.rfind(b"\n") + 1
+        if cut:
+            yield decode_lines(pending[:cut], stream=True, errors=errors)
+            pending = pending[cut:]
+    if pending:
+        yield decode_lines(pending, stream=True, errors=errors)
+
+
+def iter_mapped_lines(
+    path: str | os.PathLike[str],
+    start: int = 0,
+    end: int | None = None,
+    *,
+    block_size: int = MAP_BLOCK_SIZE,
+) -> Iterator[str]:
+    """Lazily yield the lines of a regular file through a read-only memory map.
+
+    The mapped bytes are decoded one newline-aligned block at a time, so only a
+    block's worth of text is alive at once and the first line is available
+    without reading the rest of the file. Lines are split exactly as
+    ``Path.read_text(...).splitlines(keepends=True)`` would split them.
+    ``start`` and ``end`` restrict the scan to a byte range that begins and ends
+    on line boundaries.
+    """
+    with open(path, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        end = size if end is None else min(end, size)
+        if start >= end:
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            released = start - start % mmap.PAGESIZE
+            position = start
+            while position < end:
+                limit = position + block_size
+                newline = mapped.find(b"\n", limit - 1, end) if limit < end else -1
+                cut = end if newline < 0 else newline + 1
+                yield from decode_lines(mapped[position:cut])
+                position = cut
+                if hasattr(mmap, "MADV_DONTNEED"):
+                    # Drop consumed pages from our resident set; the page cache
+                    # keeps them, so this only stops RSS tracking the file size.
+                    boundary = position - position % mmap.PAGESIZE
+                    if boundary > released:
+                        mapped.madvise(mmap.MADV_DONTNEED, released, boundary - released)
+                        released = boundary
+
+
+def decode_lines(data: bytes, *, stream: bool = False, errors: str = "strict") -> list[str]:
+    """Decode a newline-aligned block of UTF-8 input into lines that keep their ends.
+
+    A file is split as ``Path.read_text().splitlines(keepends=True)`` splits it:
+    ``\\r\\n`` and ``\\r`` are read as ``\\n``, and the other ``splitlines``
+    boundaries end lines too. A ``stream`` is split as ``sys.stdin`` on POSIX
+    splits it: on ``\\n`` only, with ``\\r`` left in place. Every reader of a
+    file or a stream decodes through here, so the two never disagree.
+    """
+    text = data.decode("utf-8", errors)
+    if not stream:
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text.splitlines(keepends=True)
+    lines = [f"{line}\n" for line in text.split("\n")]
+    last = lines.pop()
+    if last != "\n":
+        lines.append(last[:-1])
+    return lines
+
+
+def remove_table(
+    lines: Iterable[str],
+    out: TextIO,
+    *,
+    delimiter: str = "|",
+    style: str | None = None,
+) -> None:
+    """Write each table row as delimited text as soon as it is read."""
+    if style is None:
+        style, lines = sniff_style(lines)
+    found = False
+    for row in iter_table_rows(lines, style=style):
+        out.write(delimiter.join(row))
+        out.write("\n")
+        found = True
+    if not found:
+        raise ValueError("no table rows found in the input")
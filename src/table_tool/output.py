@@ -0,0 +1,128 @@
+"""Buffered, incrementally encoded output.
+
+Rendering produces many short lines. ``BufferedTextWriter`` collects them and,
+once ``buffer_size`` characters are pending, joins, encodes and hands them to
+the underlying binary stream in one ``write`` call, so neither the whole table
+nor its encoded form is ever held at once and the per-line cost stays low.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+# Annotation-only imports; the typing module is not needed at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from typing import BinaryIO, TextIO
+
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+
+class BufferedTextWriter:
+    """A write-only text stream over a binary one; see the module docstring.
+
+    With ``encoding`` set to None, ``raw`` is a text stream and the joined text
+    is written to it as-is.
+
+    ``flush`` pushes pending text through to the binary stream and flushes it,
+    so callers that flush per batch of input (``--sample``, ``--follow``) still
+    stream.
+    """
+
+    __slots__ = ("raw", "buffer_size", "encoding", "errors", "_pending", "_size")
+
+    def __init__(
+        self,
+        raw: BinaryIO | TextIO,
+        *,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        encoding: str | None = "utf-8",
+        errors: str = "strict",
+    ) -> None:
+        self.raw = raw
+        self.buffer_size = buffer_size
+        self.encoding = encoding
+        self.errors = errors
+        self._pending: list[str] = []
+        self._size = 0
+
+    def write(self, text: str) -> int:
+        self._pending.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_size:
+            self._drain()
+        return len(text)
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        """Write each line followed by a newline."""
+        for line in lines:
+            self._pending.append(line)
+            self._pending.append("\n")
+            self._size += len(line) + 1
+            if self._size >= self.buffer_size:
+                self._drain()
+
+    def write_bytes(self, data: bytes) -> None:
+        """Write already encoded bytes after any pending text; needs a binary ``raw``."""
+        self._drain()
+        self.raw.write(data)
+
+    def flush(self) -> None:
+        self._drain()
+        self.raw.flush()
+
+    def close(self) -> None:
+        """Write pending text and close ``raw``; a compressor writes its trailer."""
+        self._drain()
+        self.raw.close()
+
+    def _drain(self) -> None:
+        if self._pending:
+            data = "".join(self._pending)
+            self._pending = []
+            self._size = 0
+            self.raw.write(data.encode(self.encoding, self.errors) if self.encoding else data)
+
+
+def open_output(
+    stream: TextIO,
+    *,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    compression: str | None = None,
+) -> BufferedTextWriter:
+    """Return a ``BufferedTextWriter`` over ``stream``'s binary buffer.
+
+    Streams without one (such as ``io.StringIO``) still get the batching, but
+    receive text. With ``compression`` (see ``table_tool.compressed``) the
+    buffer gets UTF-8 text through a compressor, and the writer must be closed
+    to finish the compressed stream; ``stream`` itself stays open.
+    """
+    raw = getattr(stream, "buffer", None)
+    if raw is None:
+        if compression is not None:
+            raise ValueError("compressed output needs a binary stream")
+        return BufferedTextWriter(stream, buffer_size=buffer_size, encoding=None)
+    stream.flush()
+    if compression is not None:
+        from .compressed import open_compressed
+
+        return BufferedTextWriter(open_compressed(raw, compression, "wb"), buffer_size=buffer_size)
+    return BufferedTextWriter(
+        raw,
+        buffer_size=buffer_size,
+        encoding=stream.encoding or "utf-8",
+        errors=stream.errors or "strict",
+    )
+
+
+def silence_stdout() -> None:
+    """Point stdout at the null device after the reader has gone away.
+
+    Python flushes ``sys.stdout`` at exit; with the pipe closed that flush
+    would raise ``BrokenPipeError`` again and print a traceback.
+    """
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+    os.close(devnull)
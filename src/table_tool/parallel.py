@@ -0,0 +1,139 @@
+"""Multi-process rendering of regular files.
+
+The input is cut into byte ranges that start and end on line boundaries. A
+first round of workers parses each range and reports its column widths and
+row count; once those are merged, a second round renders each range with the
+global widths and its starting row number, and the results are written back
+in input order. The output is identical to the serial renderer.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, repeat
+
+from .inputs import iter_mapped_lines
+from .render import RenderPlan, cap_widths, column_widths, iter_rows, padded_rows
+
+# Annotation-only imports; the typing module is not needed at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+    from typing import TextIO
+
+CHUNKS_PER_JOB = 4
+MAX_CHUNK_SIZE = 32 << 20
+
+
+def split_ranges(path: str, chunk_count: int) -> list[tuple[int, int]]:
+    """Cut ``path`` into at most ``chunk_count`` newline-aligned byte ranges."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    step = max(size // chunk_count, 1)
+    ranges: list[tuple[int, int]] = []
+    with open(path, "rb") as handle, mmap.mmap(
+        handle.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        start = 0
+        while start < size:
+            newline = mapped.find(b"\n", min(start + step, size) - 1)
+            end = size if newline < 0 else newline + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def merge_widths(per_chunk: Iterable[Sequence[int]]) -> list[int]:
+    """Combine per-chunk column widths into the widest value per column."""
+    widths: list[int] = []
+    for chunk_widths in per_chunk:
+        if len(chunk_widths) > len(widths):
+            widths.extend([0] * (len(chunk_widths) - len(widths)))
+        for idx, width in enumerate(chunk_widths):
+            widths[idx] = max(widths[idx], width)
+    return widths
+
+
+def measure_chunk(path: str, start: int, end: int, delimiter: str) -> tuple[list[int], int]:
+    """Return the column widths and row count of one byte range."""
+    row_count = 0
+
+    def counted(rows: Iterable[list[str]]) -> Iterator[list[str]]:
+        nonlocal row_count
+        for row in rows:
+            row_count += 1
+            yield row
+
+    lines = iter_mapped_lines(path, start, end)
+    widths = column_widths(counted(iter_rows(lines, delimiter=delimiter)))
+    return widths, row_count
+
+
+def render_chunk(
+    path: str,
+    start: int,
+    end: int,
+    delimiter: str,
+    plan: RenderPlan,
+    first_row: int,
+    closes: bool,
+) -> str:
+    """Render one byte range as a slice of the whole table."""
+    rows = padded_rows(
+        iter_rows(iter_mapped_lines(path, start, end), delimiter=delimiter),
+        len(plan.widths),
+    )
+    lines = plan.iter_lines(rows, first_row=first_row, closes=closes)
+    return "".join(f"{line}\n" for line in lines)
+
+
+def render_parallel(
+    path: str,
+    out: TextIO,
+    *,
+    jobs: int,
+    delimiter: str = "|",
+    thick_border_interval: int | str = 3,
+    style: str = "t",
+    max_widths: Sequence[int] | None = None,
+    overflow: str = "truncate",
+) -> None:
+    chunk_count = max(jobs * CHUNKS_PER_JOB, os.path.getsize(path) // MAX_CHUNK_SIZE)
+    ranges = split_ranges(path, chunk_count)
+    starts = [start for start, _ in ranges]
+    ends = [end for _, end in ranges]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        measured = list(pool.map(measure_chunk, repeat(path), starts, ends, repeat(delimiter)))
+        widths = merge_widths(chunk_widths for chunk_widths, _ in measured)
+        if not widths:
+            raise ValueError("no rows found in the input")
+        plan = RenderPlan(
+            cap_widths(widths, max_widths),
+            style=style,
+            thick_border_interval=thick_border_interval,
+            overflow=overflow if max_widths else None,
+        )
+        counts = [count for _, count in measured]
+        first_rows = [total - count + 1 for total, count in zip(accumulate(counts), counts)]
+        last_chunk = max(idx for idx, count in enumerate(counts) if count)
+        chunks = [idx for idx, count in enumerate(counts) if count]
+        rendered = pool.map(
+            render_chunk,
+            repeat(path),
+            [starts[idx] for idx in chunks],
+            [ends[idx] for idx in chunks],
+            repeat(delimiter),
+            repeat(plan),
+            [first_rows[idx] for idx in chunks],
+            [idx == last_chunk for idx in chunks],
+        )
+        try:
+            for text in rendered:
+                out.write(text)
+        except BaseException:
+            # Do not render chunks nobody will read (e.g. the pipe closed).
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
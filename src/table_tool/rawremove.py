@@ -0,0 +1,191 @@
+"""Bytes-level ``-r`` for ASCII tables.
+
+Rows of a ``t`` or ``m`` table are bordered with ``|`` on both sides, so for
+ASCII input the borders, padding and separators can be removed without
+decoding the input or encoding the output. The input is read in
+newline-aligned blocks. In each block the row lines are picked out and joined
+with ``ROW_MARK``, the whole block is split on ``|`` once, every cell is
+stripped and the cells are re-joined with the output delimiter; the row marks
+(with the delimiters around them) then turn into newlines. The result is
+written to the output's binary stream as it is.
+
+A block is only handled this way when it is ASCII and free of the control
+characters that the text path treats as line breaks or strips as whitespace
+(``\\r``, ``\\x0b``, ``\\x0c`` and ``\\x1c`` to ``\\x1f``); otherwise it is
+decoded and goes through ``iter_table_rows``. The whole input takes the text
+path for the ``g`` style, when its first block is not plain ASCII (the style
+could not be told from bytes), or when the output is not UTF-8 or ASCII. The
+output is identical either way.
+"""
+
+from __future__ import annotations
+
+import codecs
+import sys
+from contextlib import nullcontext
+from itertools import chain
+
+from .compressed import open_compressed, stream_compression
+from .inputs import MAP_BLOCK_SIZE, decode_lines, remove_table
+from .render import STYLE_LOOKAHEAD, iter_table_rows
+
+# Annotation-only imports; the typing module is not needed at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from typing import BinaryIO, ContextManager, TextIO
+
+    from .output import BufferedTextWriter
+
+# Joins the row lines of a block; never present in a block taken this way.
+ROW_MARK = b"\x1e"
+UNSAFE_BYTES = (b"\r", b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e", b"\x1f")
+BYTE_ENCODINGS = ("utf-8", "ascii")
+
+
+def is_plain(block: bytes) -> bool:
+    """Tell whether ``block`` can be handled as bytes; see the module docstring."""
+    # One memchr-backed scan per byte is much faster than a regex class.
+    return block.isascii() and not any(unsafe in block for unsafe in UNSAFE_BYTES)
+
+
+def iter_blocks(
+    stream: BinaryIO,
+    *,
+    block_size: int = MAP_BLOCK_SIZE,
+    first_lines: int = STYLE_LOOKAHEAD,
+) -> Iterator[bytes]:
+    """Yield the stream in blocks that end just after a newline.
+
+    The first block holds at least ``first_lines`` lines (or all of the input),
+    so the table style can be told from it alone.
+    """
+    pending = b""
+    wanted = first_lines
+    while True:
+        chunk = stream.read(block_size)
+        if not chunk:
+            if pending:
+                yield pending
+            return
+        pending += chunk
+        if wanted and pending.count(b"\n") < wanted:
+            continue
+        cut = pending.rfind(b"\n") + 1
+        if cut:
+            wanted = 0
+            yield pending[:cut]
+            pending = pending[cut:]
+
+
+def remove_block(block: bytes, delimiter: bytes) -> bytes:
+    """Return the delimited rows of a plain-ASCII block, one per line."""
+    lines = [line for line in block.split(b"\n") if line[:1] == b"|" and line[-1:] == b"|"]
+    if not lines:
+        return b""
+    if b"|" in lines:
+        # A lone "|" is a row with one empty cell.
+        lines = [b"||" if line == b"|" else line for line in lines]
+    cells = ROW_MARK.join(lines).split(b"|")
+    text = delimiter.join(map(bytes.strip, cells))[len(delimiter) : -len(delimiter)]
+    return text.replace(delimiter + ROW_MARK + delimiter, b"\n") + b"\n"
+
+
+def decode_blocks(blocks: Iterable[bytes], *, errors: str, split_lines: bool) -> Iterator[str]:
+    """Decode blocks into lines as the text path would have read them.
+
+    Regular files are split as files, other streams as streams (see
+    ``table_tool.inputs.decode_lines``).
+    """
+    for block in blocks:
+        yield from decode_lines(block, stream=not split_lines, errors=errors)
+
+
+def remove_table_bytes(
+    source: str,
+    out: BufferedTextWriter,
+    *,
+    delimiter: str = "|",
+    style: str | None = None,
+    stdin: TextIO | None = None,
+) -> None:
+    """Like ``remove_table`` on ``source`` (a path, or ``-`` for ``stdin``), on bytes.
+
+    Compressed input is decompressed on the fly (see ``table_tool.compressed``).
+    ``stdin`` defaults to ``sys.stdin``.
+    """
+    if source == "-":
+        if stdin is None:
+            stdin = sys.stdin
+        buffer = getattr(stdin, "buffer", None)
+        compression = stream_compression(buffer)
+        if compression is None and (
+            buffer is None or codecs.lookup(stdin.encoding).name != "utf-8"
+        ):
+            remove_table(stdin, out, delimiter=delimiter, style=style)
+            return
+        with open_input(buffer, compression) as stream:
+            remove_stream(
+                stream,
+                out,
+                delimiter=delimiter,
+                style=style,
+                errors=(stdin.errors or "strict") if compression is None else "strict",
+                split_lines=False,
+            )
+        return
+    try:
+        raw = open(source, "rb")
+    except FileNotFoundError:
+        raise FileNotFoundError(f"input file '{source}' does not exist") from None
+    with raw, open_input(raw, stream_compression(raw)) as stream:
+        remove_stream(
+            stream, out, delimiter=delimiter, style=style, errors="strict", split_lines=True
+        )
+
+
+def open_input(raw: BinaryIO, compression: str | None) -> ContextManager[BinaryIO]:
+    if compression is None:
+        return nullcontext(raw)
+    return open_compressed(raw, compression)
+
+
+def remove_stream(
+    stream: BinaryIO,
+    out: BufferedTextWriter,
+    *,
+    delimiter: str,
+    style: str | None,
+    errors: str,
+    split_lines: bool,
+) -> None:
+    blocks = iter_blocks(stream)
+    first = next(blocks, b"")
+    blocks = chain((first,), blocks)
+    if (
+        style == "g"
+        or not is_plain(first)
+        or out.encoding is None
+        or codecs.lookup(out.encoding).name not in BYTE_ENCODINGS
+    ):
+        lines = decode_blocks(blocks, errors=errors, split_lines=split_lines)
+        remove_table(lines, out, delimiter=delimiter, style=style)
+        return
+    # A plain first block can only hold "|"-bordered rows, so the style is
+    # "t" or "m"; both strip the same way.
+    raw_delimiter = delimiter.encode("ascii")
+    found = False
+    for block in blocks:
+        if is_plain(block):
+            data = remove_block(block, raw_delimiter)
+            if data:
+                out.write_bytes(data)
+                found = True
+            continue
+        lines = decode_blocks((block,), errors=errors, split_lines=split_lines)
+        for row in iter_table_rows(lines, style="t"):
+            out.write(delimiter.join(row))
+            out.write("\n")
+            found = True
+    if not found:
+        raise ValueError("no table rows found in the input")
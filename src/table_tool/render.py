@@ -0,0 +1,612 @@
+"""Core table parsing, measuring and rendering.
+
+This module has no command-line dependencies so library callers pay only for
+what they use: it avoids ``typing``, ``argparse`` and ``pathlib``, and wcwidth
+is loaded by ``table_tool.width`` the first time non-ASCII text is measured.
+(``collections`` does get loaded, by the ``array`` module behind
+``table_tool.columnar``.)
+
+Every function here may be called from several threads at once, including on
+free-threaded builds: the style definitions are read-only mappings, plans are
+not changed after construction, and the only shared mutable state is the
+width memo in ``table_tool.width``.
+"""
+
+from __future__ import annotations
+
+from itertools import chain, islice, zip_longest
+from types import MappingProxyType
+
+from .columnar import ColumnarTable
+from .width import display_width
+
+# Annotation-only imports; collections.abc is not needed at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+
+    from .stats import RenderStats
+
+STYLE_LOOKAHEAD = 64
+OVERFLOW_MODES = ("truncate", "wrap")
+TRUNCATION_MARK = "…"
+STYLE_DEFINITIONS: Mapping[str, Mapping[str, object]] = MappingProxyType(
+    {
+        "m": MappingProxyType(
+            {
+                "vertical": "|",
+                "top": ("+", "+", "+", "-"),
+                "middle_thin": (" ", "+", "+", " "),
+                "middle_thick": ("+", "+", "+", "-"),
+                "bottom_thin": ("+", "+", "+", "-"),
+                "bottom_thick": ("+", "+", "+", "-"),
+            }
+        ),
+        "t": MappingProxyType(
+            {
+                "vertical": "|",
+                "top": ("+", "+", "+", "-"),
+                "middle_thin": ("+", "+", "+", "-"),
+                "middle_thick": ("+", "+", "+", "="),
+                "bottom_thin": ("+", "+", "+", "-"),
+                "bottom_thick": ("+", "+", "+", "="),
+            }
+        ),
+        "g": MappingProxyType(
+            {
+                "vertical": "│",
+                "top": ("┌", "┬", "┐", "─"),
+                "middle_thin": ("├", "┼", "┤", "─"),
+                "middle_thick": ("╞", "╪", "╡", "═"),
+                "bottom_thin": ("└", "┴", "┘", "─"),
+                "bottom_thick": ("╘", "╧", "╛", "═"),
+            }
+        ),
+    }
+)
+
+
+def detect_style(lines: Sequence[str]) -> str:
+    for style_key, config in STYLE_DEFINITIONS.items():
+        vertical = config["vertical"]
+        for raw_line in lines:
+            line = raw_line.rstrip("\n")
+            if line and line.startswith(vertical) and line.endswith(vertical):
+                return style_key
+    return "t"
+
+
+def sniff_style(
+    lines: Iterable[str],
+    *,
+    lookahead: int = STYLE_LOOKAHEAD,
+) -> tuple[str, Iterator[str]]:
+    """Detect the table style from at most ``lookahead`` leading lines.
+
+    Lines are read until the first bordered one. Returns the style and an
+    iterator that replays the buffered lines before the rest of the input, so
+    detection costs no second pass.
+    """
+    iterator = iter(lines)
+    buffered = list(islice(iterator, lookahead))
+    style = "t"
+    for raw_line in buffered:
+        line = raw_line.rstrip("\n")
+        matches = [
+            style_key
+            for style_key, config in STYLE_DEFINITIONS.items()
+            if line and line.startswith(config["vertical"]) and line.endswith(config["vertical"])
+        ]
+        if matches:
+            style = matches[0]
+            break
+    return style, chain(buffered, iterator)
+
+
+def iter_rows(
+    lines: Iterable[str],
+    *,
+    skip_empty: bool = True,
+    delimiter: str = "|",
+) -> Iterator[list[str]]:
+    """Lazily split input lines into cells, one row at a time."""
+    for raw_line in lines:
+        line = raw_line.rstrip("\n")
+        if skip_empty and not line.strip():
+            continue
+        yield [cell.strip() for cell in line.split(delimiter)]
+
+
+def iter_csv_rows(
+    lines: Iterable[str],
+    *,
+    skip_empty: bool = True,
+    delimiter: str = ",",
+) -> Iterator[list[str]]:
+    """Lazily parse CSV records with the C ``csv`` reader, one row at a time.
+
+    Quoted fields may contain the delimiter, doubled quotes and line breaks; a
+    record spanning several input lines is a single row. Cells are stripped
+    like ``iter_rows`` does, and blank records are skipped.
+    """
+    import csv
+
+    for record in csv.reader(lines, delimiter=delimiter, skipinitialspace=True):
+        if skip_empty and (not record or (len(record) == 1 and not record[0].strip())):
+            continue
+        yield [cell.strip() for cell in record]
+
+
+def row_parser(csv_quoting: bool) -> Callable[..., Iterator[list[str]]]:
+    """Return ``iter_csv_rows`` for CSV input and ``iter_rows`` otherwise."""
+    return iter_csv_rows if csv_quoting else iter_rows
+
+
+def parse_rows(
+    lines: Iterable[str],
+    *,
+    skip_empty: bool = True,
+    delimiter: str = "|",
+) -> list[list[str]]:
+    rows = list(iter_rows(lines, skip_empty=skip_empty, delimiter=delimiter))
+    if not rows:
+        raise ValueError("no rows found in the input")
+    return rows
+
+
+def normalise_rows(rows: Sequence[list[str]]) -> list[list[str]]:
+    max_columns = max(len(row) for row in rows)
+    return [row + [""] * (max_columns - len(row)) for row in rows]
+
+
+def transpose_rows(rows: Sequence[Sequence[str]]) -> list[list[str]]:
+    return [list(column) for column in zip(*rows)]
+
+
+def column_widths(rows: Iterable[Sequence[str]]) -> list[int]:
+    """Return the widest cell per column; ragged rows widen the result as needed."""
+    widths: list[int] = []
+    for row in rows:
+        if len(row) > len(widths):
+            widths.extend([0] * (len(row) - len(widths)))
+        for idx, cell in enumerate(row):
+            widths[idx] = max(widths[idx], display_width(cell))
+    return widths
+
+
+def iter_table_rows(lines: Iterable[str], *, style: str) -> Iterator[list[str]]:
+    """Lazily strip borders and padding from rendered table lines."""
+    vertical = STYLE_DEFINITIONS[style]["vertical"]
+    for raw_line in lines:
+        line = raw_line.rstrip("\n")
+        if not line:
+            continue
+        if not (line.startswith(vertical) and line.endswith(vertical)):
+            continue
+        inner = line[1:-1]
+        yield [cell.strip() for cell in inner.split(vertical)]
+
+
+def extract_table_rows(
+    lines: Sequence[str],
+    *,
+    style: str | None = None,
+) -> list[list[str]]:
+    style_to_use = style or detect_style(lines)
+    rows = list(iter_table_rows(lines, style=style_to_use))
+    if not rows:
+        raise ValueError("no table rows found in the input")
+    return rows
+
+
+def cap_widths(widths: Sequence[int], max_widths: Sequence[int] | None) -> list[int]:
+    """Clamp measured widths; a single cap applies to every column."""
+    if not max_widths:
+        return list(widths)
+    if len(max_widths) == 1:
+        return [min(width, max_widths[0]) for width in widths]
+    return [
+        min(width, cap) if cap is not None else width
+        for width, cap in zip_longest(widths, max_widths[: len(widths)])
+    ]
+
+
+def split_at_width(text: str, width: int) -> tuple[str, str]:
+    """Split ``text`` into the longest prefix fitting ``width`` and the rest."""
+    used = 0
+    for idx, char in enumerate(text):
+        char_width = display_width(char)
+        if used + char_width > width:
+            return text[:idx], text[idx:]
+        used += char_width
+    return text, ""
+
+
+def truncate_cell(text: str, width: int) -> str:
+    """Cut ``text`` to ``width`` columns, marking the cut with ``TRUNCATION_MARK``."""
+    if display_width(text) <= width:
+        return text
+    if width < 1:
+        return ""
+    head, _ = split_at_width(text, width - 1)
+    return head + TRUNCATION_MARK
+
+
+def wrap_cell(text: str, width: int) -> list[str]:
+    """Hard-wrap ``text`` into pieces of at most ``width`` columns each."""
+    if width < 1 or display_width(text) <= width:
+        return [truncate_cell(text, width)]
+    pieces: list[str] = []
+    rest = text
+    while rest:
+        head, rest = split_at_width(rest, width)
+        if not head:
+            # A single glyph wider than the column: emit it on its own line.
+            head, rest = rest[0], rest[1:]
+        pieces.append(head)
+    return pieces
+
+
+def fit_row(
+    row: Sequence[str],
+    widths: Sequence[int],
+    overflow: str | None,
+) -> list[Sequence[str]]:
+    """Return the physical lines for ``row`` once over-wide cells are handled.
+
+    With ``overflow`` set to ``None`` the row is returned untouched; ``"truncate"``
+    cuts over-wide cells and ``"wrap"`` continues them on extra lines below.
+    With either mode, a cell holding line breaks (a multi-line CSV field)
+    continues on extra lines below, one line of the cell per physical line.
+    """
+    if overflow is None or all(
+        display_width(cell) <= width and "\n" not in cell for cell, width in zip(row, widths)
+    ):
+        return [row]
+    if overflow == "truncate" and not any("\n" in cell for cell in row):
+        return [[truncate_cell(cell, width) for cell, width in zip(row, widths)]]
+    fit_cell = truncate_cell if overflow == "truncate" else wrap_cell
+    pieces = []
+    for cell, width in zip(row, widths):
+        cell_lines = []
+        for part in cell.split("\n"):
+            fitted = fit_cell(part, width)
+            if isinstance(fitted, str):
+                cell_lines.append(fitted)
+            else:
+                cell_lines.extend(fitted)
+        pieces.append(cell_lines)
+    return [list(line) for line in zip_longest(*pieces, fillvalue="")]
+
+
+def border_name(row_index: int, is_last: bool, thick_border_interval: int | str) -> str:
+    """Name the ``STYLE_DEFINITIONS`` border drawn below the 1-based ``row_index``."""
+    assert isinstance(thick_border_interval, int)
+    use_thick_border = (
+        thick_border_interval > 0 and row_index % thick_border_interval == 0
+    )
+    if is_last:
+        return "bottom_thick" if use_thick_border else "bottom_thin"
+    return "middle_thick" if use_thick_border else "middle_thin"
+
+
+def pad_cell(cell: str, width: int) -> str:
+    """Left-align ``cell`` in ``width`` display columns."""
+    return cell.ljust(width - display_width(cell) + len(cell))
+
+
+class RenderPlan:
+    """Everything about a table layout that does not depend on the cell values.
+
+    A plan is built once from the column widths, style and thick border
+    interval: border lines are pre-rendered and each row is formatted through
+    a precomputed template, so rendering a row costs only the cell padding and
+    one ``str.format`` call. Plans are immutable and can be cached and reused
+    for any number of tables with the same shape.
+    """
+
+    __slots__ = (
+        "widths",
+        "style",
+        "thick_border_interval",
+        "overflow",
+        "borders",
+        "_template",
+    )
+
+    def __init__(
+        self,
+        widths: Sequence[int],
+        *,
+        style: str = "t",
+        thick_border_interval: int | str = 3,
+        overflow: str | None = None,
+    ) -> None:
+        self.widths = tuple(widths)
+        self.style = style
+        self.thick_border_interval = thick_border_interval
+        self.overflow = overflow
+        self.borders: dict[str, str | None] = {}
+        if thick_border_interval == "x":
+            self._template = " ".join(["{}"] * len(self.widths))
+            return
+        assert isinstance(thick_border_interval, int)
+        style_config = STYLE_DEFINITIONS[style]
+        vertical = str(style_config["vertical"]).replace("{", "{{").replace("}", "}}")
+        self._template = vertical + vertical.join([" {} "] * len(self.widths)) + vertical
+        for name in (
+            "top",
+            "middle_thin",
+            "middle_thick",
+            "bottom_thin",
+            "bottom_thick",
+        ):
+            left, mid, right, fill = style_config[name]
+            border = left + mid.join(fill * (width + 2) for width in self.widths) + right
+            # Styles drop a separator entirely by starting it with a blank.
+            self.borders[name] = None if border[0] == " " and name != "top" else border
+
+    def format_row(self, row: Sequence[str]) -> str:
+        """Render one physical line; cells must already fit their columns."""
+        line = self._template.format(*map(pad_cell, row, self.widths))
+        return line.rstrip() if self.thick_border_interval == "x" else line
+
+    def format_padded_row(self, row: Sequence[str]) -> str:
+        """Like ``format_row`` for cells already padded to their column widths."""
+        line = self._template.format(*row)
+        return line.rstrip() if self.thick_border_interval == "x" else line
+
+    def row_lines(self, row: Sequence[str]) -> list[str]:
+        """Render a row, applying the plan's overflow policy (see ``fit_row``)."""
+        return [self.format_row(line) for line in fit_row(row, self.widths, self.overflow)]
+
+    def _padded_row_lines(self, row: Sequence[str]) -> tuple[str]:
+        return (self.format_padded_row(row),)
+
+    def border_after(self, row_index: int, is_last: bool) -> str | None:
+        """Return the border drawn below the 1-based ``row_index``, if any."""
+        if self.thick_border_interval == "x":
+            return None
+        return self.borders[
+            border_name(row_index, is_last, self.thick_border_interval)
+        ]
+
+    def iter_lines(
+        self,
+        rows: Iterable[Sequence[str]],
+        *,
+        first_row: int = 1,
+        closes: bool = True,
+        padded: bool = False,
+    ) -> Iterator[str]:
+        """Yield the rendered table line by line without holding the rows in memory.
+
+        Rows are consumed once, with a single row of look-ahead to place the
+        bottom border, so ``rows`` may be a generator. Each row is yielded
+        before the next one is read.
+
+        A table can also be rendered in consecutive slices: ``first_row`` is the
+        1-based number of the first row in ``rows`` (the top border is only
+        drawn for row 1), and with ``closes`` false the final row gets a middle
+        border because more rows follow.
+
+        With ``padded``, every cell is already padded to its column width (see
+        ``ColumnarTable.iter_padded_rows``) and the overflow policy is not
+        applied.
+        """
+        row_lines = self._padded_row_lines if padded else self.row_lines
+        if self.thick_border_interval == "x":
+            for row in rows:
+                yield from row_lines(row)
+            return
+
+        if first_row == 1:
+            yield self.borders["top"]
+        end = object()
+        iterator = iter(rows)
+        row = next(iterator, end)
+        row_index = first_row - 1
+        # -------------------------------------------------
+        while row is not end:
+            row_index += 1
+            yield from row_lines(row)
+            next_row = next(iterator, end)
+            border = self.border_after(row_index, closes and next_row is end)
+            if border is not None:
+                yield border
+            row = next_row
+
+    def render(self, rows: Iterable[Sequence[str]]) -> str:
+        return "\n".join(self.iter_lines(rows))
+
+
+def iter_table_lines(
+    rows: Iterable[Sequence[str]],
+    widths: Sequence[int],
+    *,
+    thick_border_interval: int | str = 3,
+    style: str = "t",
+    overflow: str | None = None,
+) -> Iterator[str]:
+    """Yield the rendered table line by line; see ``RenderPlan.iter_lines``."""
+    plan = RenderPlan(
+        widths,
+        style=style,
+        thick_border_interval=thick_border_interval,
+        overflow=overflow,
+    )
+    return plan.iter_lines(rows)
+
+
+class _NoStage:
+    """Stand-in for ``RenderStats.stage`` when no statistics are collected."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+
+_NO_STAGE = _NoStage()
+
+
+def _skip_stage(name: str) -> _NoStage:
+    return _NO_STAGE
+
+
+def render_table(
+    rows: Sequence[Sequence[str]],
+    *,
+    thick_border_interval: int | str = 3,
+    style: str = "t",
+    stats: RenderStats | None = None,
+) -> str:
+    stage = stats.stage if stats is not None else _skip_stage
+    with stage("measure"):
+        widths = column_widths(rows)
+    with stage("render"):
+        table = "\n".join(
+            iter_table_lines(
+                rows,
+                widths,
+                thick_border_interval=thick_border_interval,
+                style=style,
+            )
+        )
+    if stats is not None:
+        stats.count(
+            rows=len(rows),
+            columns=len(widths),
+            cells=sum(map(len, rows)),
+            output_bytes=len(table.encode("utf-8")),
+        )
+    return table
+
+
+def padded_rows(rows: Iterable[list[str]], column_count: int) -> Iterator[list[str]]:
+    """Pad ragged rows on the fly, the streaming counterpart of ``normalise_rows``."""
+    for row in rows:
+        if len(row) < column_count:
+            row = row + [""] * (column_count - len(row))
+        yield row
+
+
+def iter_text_lines(
+    lines: Iterable[str],
+    *,
+    delimiter: str = "|",
+    thick_border_interval: int | str = 3,
+    style: str = "t",
+    transpose: bool = False,
+    max_widths: Sequence[int] | None = None,
+    overflow: str = "truncate",
+    csv_quoting: bool = False,
+    stats: RenderStats | None = None,
+) -> Iterator[str]:
+    """Parse delimited lines into memory and return an iterator over the rendered lines.
+
+    Parsing and measuring happen before this returns, so input errors are raised
+    here; the lines themselves are rendered as they are consumed. With
+    ``csv_quoting`` the input is parsed by ``iter_csv_rows``. With ``stats``,
+    the ``parse`` and ``measure`` stages and the table counters are recorded
+    into it.
+    """
+    stage = stats.stage if stats is not None else _skip_stage
+    if stats is not None:
+        lines = stats.count_input(lines)
+    with stage("parse"):
+        stored = ColumnarTable.from_rows(row_parser(csv_quoting)(lines, delimiter=delimiter))
+    if not stored.row_count:
+        raise ValueError("no rows found in the input")
+    plan_overflow = layout_overflow(
+        stored, max_widths=max_widths, overflow=overflow, csv_quoting=csv_quoting
+    )
+    with stage("measure"):
+        widths = cap_widths(stored.row_widths() if transpose else stored.widths(), max_widths)
+    if stats is not None:
+        # Count the table as rendered: transposing swaps its rows and columns.
+        rows, columns = stored.row_count, len(stored.columns)
+        if transpose:
+            rows, columns = columns, rows
+        stats.count(rows=rows, columns=columns, cells=rows * columns)
+    plan = RenderPlan(
+        widths,
+        style=style,
+        thick_border_interval=thick_border_interval,
+        overflow=plan_overflow,
+    )
+    if transpose:
+        return plan.iter_lines(stored.iter_columns())
+    if plan_overflow is None:
+        # Pad each distinct value once rather than every cell.
+        return plan.iter_lines(stored.iter_padded_rows(widths), padded=True)
+    return plan.iter_lines(stored.iter_rows())
+
+
+def layout_overflow(
+    stored: ColumnarTable,
+    *,
+    max_widths: Sequence[int] | None,
+    overflow: str,
+    csv_quoting: bool,
+) -> str | None:
+    """Return the overflow policy a plan for ``stored`` needs, or None if every cell fits."""
+    if max_widths:
+        return overflow
+    if csv_quoting and stored.has_line_breaks():
+        # Overflow handling splits multi-line fields; no cell is too wide.
+        return "truncate"
+    return None
+
+
+def render_text(
+    lines: Iterable[str],
+    *,
+    delimiter: str = "|",
+    thick_border_interval: int | str = 3,
+    style: str = "t",
+    transpose: bool = False,
+    max_widths: Sequence[int] | None = None,
+    overflow: str = "truncate",
+    csv_quoting: bool = False,
+    stats: RenderStats | None = None,
+) -> str:
+    """Parse delimited lines and render them as a table held in memory.
+
+    With ``stats``, the ``parse``, ``measure`` and ``render`` stages and the
+    table counters are recorded into it.
+    """
+    table_lines = iter_text_lines(
+        lines,
+        delimiter=delimiter,
+        thick_border_interval=thick_border_interval,
+        style=style,
+        transpose=transpose,
+        max_widths=max_widths,
+        overflow=overflow,
+        csv_quoting=csv_quoting,
+        stats=stats,
+    )
+    if stats is None:
+        return "\n".join(table_lines)
+    with stats.stage("render"):
+        table = "\n".join(table_lines)
+    stats.count(output_bytes=len(table.encode("utf-8")))
+    return table
+
+
+def fold_rows(rows: Iterable[list[str]], column_count: int, delimiter: str) -> Iterator[list[str]]:
+    """Fit rows to a fixed column count.
+
+    Short rows are padded; surplus cells are re-joined with ``delimiter`` into
+    the last column so no data is dropped.
+    """
+    for row in rows:
+        if len(row) > column_count:
+            row = row[: column_count - 1] + [delimiter.join(row[column_count - 1 :])]
+        elif len(row) < column_count:
+            row = row + [""] * (column_count - len(row))
+        yield row
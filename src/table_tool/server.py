@@ -0,0 +1,265 @@
+"""Persistent render server and its thin client.
+
+``table_tool serve`` listens on a Unix domain socket and keeps the interpreter,
+the rendering code and the argument parser warm between requests. Each request
+is one JSON line::
+
+    {"argv": ["-s", "g", "-"], "cwd": "/path/of/caller", "stdin": "a|b\\n"}
+
+and each reply is one JSON line ``{"status": 0, "stdout": "...", "stderr": ""}``.
+A request runs the ordinary command line, with the caller's standard input,
+captured output streams and working directory passed to ``cli.main``
+explicitly; nothing process-wide is swapped. asyncio serves many connections
+at once and runs each render on a worker thread, so the event loop stays free
+to accept requests and to handle SIGTERM. A render that takes longer than
+``REQUEST_TIMEOUT`` seconds is answered with an error, and fails at its next
+write. Modes that run until the input ends (``--follow``), write files of
+their own (batch mode) or trace the memory of the whole process (``--stats``)
+are refused; input paths must be regular files, since a pipe or device path
+would be read from the server's side.
+
+``table_tool client`` sends its arguments to the server and prints the reply.
+When no server is listening it renders in-process instead, so scripts can use
+it unconditionally.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import sys
+
+SOCKET_ENV = "TABLE_TOOL_SOCKET"
+SUBCOMMANDS = ("serve", "client")
+MAX_REQUEST_SIZE = 64 << 20
+REQUEST_TIMEOUT = 60.0
+SERVE_USAGE = "usage: table_tool serve [--socket PATH]"
+
+
+class RequestAbandoned(Exception):
+    """Raised by a request's output once the server has given up on the request."""
+
+
+class RequestOutput(io.StringIO):
+    """Captures a request's stdout; writing fails once ``abandoned`` is set."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.abandoned = False
+
+    def write(self, text: str) -> int:
+        if self.abandoned:
+            raise RequestAbandoned("the server stopped waiting for this request")
+        return super().write(text)
+
+
+def default_socket_path() -> str:
+    explicit = os.environ.get(SOCKET_ENV)
+    if explicit:
+        return explicit
+    directory = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(directory, f"table_tool-{os.getuid()}.sock")
+
+
+def reads_stdin(argv: list[str]) -> bool:
+    """Tell whether ``argv`` names standard input as a source (not ``-d -``)."""
+    previous = None
+    for arg in argv:
+        if arg == "-" and previous not in ("-d", "--delimiter"):
+            return True
+        previous = arg
+    return False
+
+
+def refused_request(argv: list[str], cwd: str) -> str | None:
+    """Return why ``argv`` cannot be run through the server, or None if it can."""
+    from .cli import HelpRequested, UsageError, shared_parser
+
+    if argv and argv[0] in SUBCOMMANDS:
+        return f"'{argv[0]}' cannot be run through the server"
+    try:
+        args = shared_parser().parse_args(argv)
+    except (UsageError, HelpRequested):
+        # ``main`` reports the mistake, or writes the help, itself.
+        return None
+    if args.follow:
+        return "--follow runs until its input ends and cannot be run through the server"
+    if args.stats:
+        # tracemalloc is process-wide: concurrent requests would stop or reset
+        # each other's tracing.
+        return "--stats measures the whole process and cannot be run through the server"
+    if len(args.inputs) > 1 or args.manifest is not None or args.output_dir or args.suffix:
+        return "batch mode (-o, --suffix, --manifest) cannot be run through the server"
+    for path in args.inputs:
+        if path == "-":
+            continue
+        path = os.path.join(cwd, path)
+        if os.path.exists(path) and not os.path.isfile(path):
+            return f"'{path}' is not a regular file; pipe it to the client as '-' instead"
+    return None
+
+
+def execute_request(
+    request: dict[str, object], stdout: io.StringIO | None = None
+) -> dict[str, object]:
+    """Run one request through ``cli.main`` and capture its exit status and output.
+
+    The request's standard input, output streams and working directory are
+    passed to ``main``, so requests may run on several threads at once.
+    """
+    from .cli import main
+
+    argv = [str(arg) for arg in request.get("argv") or []]
+    cwd = str(request.get("cwd") or os.getcwd())
+    refusal = refused_request(argv, cwd)
+    if refusal is not None:
+        return {"status": 2, "stdout": "", "stderr": f"error: {refusal}\n"}
+    stdout = io.StringIO() if stdout is None else stdout
+    stderr = io.StringIO()
+    status = main(
+        argv,
+        stdin=io.StringIO(str(request.get("stdin") or "")),
+        stdout=stdout,
+        stderr=stderr,
+        cwd=cwd,
+    )
+    return {"status": status, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+def claim_socket(socket_path: str) -> None:
+    """Remove a stale socket file, refusing if a live server still owns it."""
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(socket_path)
+            return
+    raise OSError(f"a server is already listening on '{socket_path}'")
+
+
+async def serve(socket_path: str, *, timeout: float = REQUEST_TIMEOUT) -> None:
+    import asyncio
+    import signal
+    from concurrent.futures import ThreadPoolExecutor
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(thread_name_prefix="table_tool-request")
+    running: set[RequestOutput] = set()
+
+    async def respond(request: dict[str, object]) -> dict[str, object]:
+        stdout = RequestOutput()
+        running.add(stdout)
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(executor, execute_request, request, stdout), timeout
+            )
+        except TimeoutError:
+            stdout.abandoned = True
+            message = f"error: the request took longer than {timeout:g} seconds\n"
+            return {"status": 1, "stdout": "", "stderr": message}
+        finally:
+            running.discard(stdout)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        # Reported like malformed JSON.
+                        raise ValueError("a request must be a JSON object")  # noqa: TRY004
+                except ValueError as exc:
+                    response = {"status": 2, "stdout": "", "stderr": f"error: bad request: {exc}\n"}
+                else:
+                    response = await respond(request)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ValueError, ConnectionError):
+            # Oversized request line or the client went away mid-reply.
+            pass
+        finally:
+            writer.close()
+
+    stop = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    server = await asyncio.start_unix_server(handle, path=socket_path, limit=MAX_REQUEST_SIZE)
+    os.chmod(socket_path, 0o600)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        # Renders still running fail at their next write instead of holding
+        # up the exit.
+        for stdout in running:
+            stdout.abandoned = True
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_server(socket_path: str) -> int:
+    import asyncio
+
+    try:
+        claim_socket(socket_path)
+    except OSError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    try:
+        asyncio.run(serve(socket_path))
+    finally:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+    return 0
+
+
+def run_client(argv: list[str], socket_path: str) -> int:
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        connection.close()
+        from .cli import main
+
+        return main(argv)
+    with connection:
+        request = {
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "stdin": sys.stdin.read() if reads_stdin(argv) else None,
+        }
+        connection.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with connection.makefile("rb") as replies:
+            reply = replies.readline()
+    try:
+        response = json.loads(reply)
+        if not isinstance(response, dict):
+            raise ValueError("the reply is not a JSON object")  # noqa: TRY004
+        status = int(response["status"])
+    except (ValueError, KeyError, TypeError) as exc:
+        problem = "no reply" if not reply else f"an invalid reply ({exc})"
+        print(f"error: the server at '{socket_path}' sent {problem}", file=sys.stderr)
+        return 1
+    sys.stdout.write(str(response.get("stdout") or ""))
+    sys.stderr.write(str(response.get("stderr") or ""))
+    return status
+
+
+def main_server(argv: list[str]) -> int:
+    """Dispatch ``serve`` and ``client``; both accept a leading ``--socket PATH``."""
+    command, rest = argv[0], argv[1:]
+    socket_path = default_socket_path()
+    if rest[:1] == ["--socket"] and len(rest) > 1:
+        socket_path, rest = rest[1], rest[2:]
+    elif rest and rest[0].startswith("--socket="):
+        socket_path, rest = rest[0].split("=", 1)[1], rest[1:]
+    if command == "client":
+        return run_client(rest, socket_path)
+    if rest:
+        print(SERVE_USAGE, file=sys.stderr)
+        print(f"error: unrecognized arguments: {' '.join(rest)}", file=sys.stderr)
+        return 2
+    return run_server(socket_path)
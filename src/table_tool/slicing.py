@@ -0,0 +1,141 @@
+"""Row selection for ``--head``, ``--tail`` and ``--rows``.
+
+Rows are numbered from 1 and, as everywhere else, blank lines are not rows.
+Selection works on input lines, so the selected lines feed the normal render
+unchanged and the slice is laid out as a table of its own: widths come from
+the selected rows only and thick borders count from the slice's first row.
+
+``--head`` and ``--rows`` stop reading as soon as the last wanted row has been
+read. ``--tail`` on a regular file reads backwards from the end, a growing
+block at a time, until it has enough rows. ``--rows`` can also use a
+line-offset index: a sidecar recording, for every ``INDEX_BLOCK`` bytes of
+input, where the block starts and how many rows precede it, so the scan can
+begin at the block holding the first wanted row.
+"""
+
+from __future__ import annotations
+
+import os
+from array import array
+from bisect import bisect_right
+from itertools import islice
+
+from .inputs import MAP_BLOCK_SIZE, decode_lines, iter_mapped_lines
+
+# Annotation-only imports; collections.abc is not needed at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+INDEX_BLOCK = 1 << 16
+INDEX_MAGIC = b"TTROWS1\n"
+
+
+def nonblank_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Yield only the lines that ``iter_rows`` would turn into rows."""
+    return (line for line in lines if line.rstrip("\n").strip())
+
+
+def select_range(lines: Iterable[str], start: int, stop: int | None) -> Iterator[str]:
+    """Yield the lines of rows ``start`` to ``stop`` (1-based, inclusive)."""
+    return islice(nonblank_lines(lines), start - 1, stop)
+
+
+def tail_stream(lines: Iterable[str], count: int) -> list[str]:
+    """Keep the last ``count`` row lines of an input that cannot be read backwards."""
+    from collections import deque
+
+    return list(deque(nonblank_lines(lines), maxlen=count))
+
+
+def tail_file(path: str, count: int, *, block_size: int = MAP_BLOCK_SIZE) -> list[str]:
+    """Return the last ``count`` row lines of a regular file, reading from the end.
+
+    The window read back doubles until it holds enough rows, and always starts
+    just after a ``\\n`` so it splits into lines exactly as a forward read would.
+    """
+    with open(path, "rb") as handle:
+        end = handle.seek(0, os.SEEK_END)
+        start = end
+        while True:
+            start = max(0, start - block_size)
+            handle.seek(start)
+            data = handle.read(end - start)
+            cut = 0
+            if start:
+                cut = data.find(b"\n") + 1
+                if not cut:
+                    block_size *= 2
+                    continue
+            rows = list(nonblank_lines(decode_lines(data[cut:])))
+            if len(rows) >= count or not start:
+                return rows[-count:]
+            block_size *= 2
+
+
+def build_row_index(path: str) -> tuple[array, array]:
+    """Scan ``path`` once and return block start offsets and the rows before each."""
+    offsets = array("Q")
+    rows_before = array("Q")
+    rows = 0
+    block_start = 0
+    pending = b""
+    with open(path, "rb") as handle:
+        while True:
+            chunk = handle.read(INDEX_BLOCK)
+            data = pending + chunk
+            if not data:
+                break
+            # Blocks end on a newline so that each splits into lines exactly
+            # as a forward read of the whole file would.
+            cut = data.rfind(b"\n") + 1 if chunk else len(data)
+            if not cut:
+                pending = data
+                continue
+            offsets.append(block_start)
+            rows_before.append(rows)
+            rows += sum(1 for _ in nonblank_lines(decode_lines(data[:cut])))
+            block_start += cut
+            pending = data[cut:]
+    return offsets, rows_before
+
+
+def load_row_index(path: str, index_path: str) -> tuple[array, array]:
+    """Load the row index for ``path``, rebuilding it if it is missing or stale."""
+    stat = os.stat(path)
+    stamp = array("Q", [stat.st_size, stat.st_mtime_ns])
+    try:
+        with open(index_path, "rb") as index:
+            if index.read(len(INDEX_MAGIC)) == INDEX_MAGIC:
+                header = array("Q")
+                header.fromfile(index, 3)
+                if header[:2] == stamp:
+                    offsets = array("Q")
+                    rows_before = array("Q")
+                    offsets.fromfile(index, header[2])
+                    rows_before.fromfile(index, header[2])
+                    return offsets, rows_before
+    except (OSError, EOFError):
+        pass
+    offsets, rows_before = build_row_index(path)
+    partial = f"{index_path}.partial"
+    with open(partial, "wb") as index:
+        index.write(INDEX_MAGIC)
+        array("Q", [*stamp, len(offsets)]).tofile(index)
+        offsets.tofile(index)
+        rows_before.tofile(index)
+    os.replace(partial, index_path)
+    return offsets, rows_before
+
+
+def select_indexed_range(
+    path: str, index_path: str, start: int, stop: int | None
+) -> Iterator[str]:
+    """Like ``select_range`` but begin reading at the block holding row ``start``."""
+    offsets, rows_before = load_row_index(path, index_path)
+    block = max(0, bisect_right(rows_before, start - 1) - 1)
+    skipped = rows_before[block] if offsets else 0
+    lines = iter_mapped_lines(path, offsets[block] if offsets else 0)
+    return select_range(
+        lines, start - skipped, None if stop is None else stop - skipped
+    )
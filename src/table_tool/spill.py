@@ -0,0 +1,179 @@
+"""Out-of-core transpose for tables that do not fit in memory.
+
+Rows are buffered until the memory budget is reached, then written to a
+temporary file as a column-major *run*: one serialised segment per column,
+holding that column's cells for the buffered rows. Each output row of the
+transposed table is one input column, so it is produced by reading that
+column's segment from every run in turn. The width of each transposed column
+is the widest cell of the matching input row, recorded while reading.
+
+Output lines can be as long as the input has rows, so they are written in
+pieces (one segment or one batch of border columns at a time) rather than
+assembled in memory. The temporary file is removed when rendering finishes or
+fails.
+"""
+
+from __future__ import annotations
+
+import marshal
+import tempfile
+from array import array
+
+from .render import (
+    STYLE_DEFINITIONS,
+    RenderPlan,
+    border_name,
+    normalise_rows,
+    pad_cell,
+    transpose_rows,
+)
+from .width import display_width
+
+# Annotation-only imports; the typing module is not needed at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+    from typing import BinaryIO, TextIO
+
+# Rough CPython cost of one buffered row list and of each str cell in it.
+ROW_OVERHEAD = 64
+CELL_OVERHEAD = 57
+BORDER_BATCH = 4096
+
+Run = tuple[int, list[tuple[int, int]]]
+
+
+def write_run(spill: BinaryIO, rows: Sequence[Sequence[str]], offset: int) -> tuple[Run, int]:
+    """Append ``rows`` column by column; return the run index and the new offset."""
+    segments: list[tuple[int, int]] = []
+    for column in range(max(len(row) for row in rows)):
+        data = marshal.dumps([row[column] if column < len(row) else "" for row in rows])
+        spill.write(data)
+        segments.append((offset, len(data)))
+        offset += len(data)
+    return (len(rows), segments), offset
+
+
+def read_segment(spill: BinaryIO, run: Run, column: int) -> list[str]:
+    row_count, segments = run
+    if column >= len(segments):
+        return [""] * row_count
+    offset, length = segments[column]
+    spill.seek(offset)
+    return marshal.loads(spill.read(length))
+
+
+def write_border(out: TextIO, name: str, style: str, widths: Sequence[int]) -> None:
+    left, mid, right, fill = STYLE_DEFINITIONS[style][name]
+    if left == " " and name != "top":
+        return
+    out.write(left)
+    for start in range(0, len(widths), BORDER_BATCH):
+        if start:
+            out.write(mid)
+        out.write(mid.join(fill * (width + 2) for width in widths[start : start + BORDER_BATCH]))
+    out.write(right)
+    out.write("\n")
+
+
+def write_transposed(
+    spill: BinaryIO,
+    runs: Sequence[Run],
+    widths: array,
+    row_count: int,
+    out: TextIO,
+    *,
+    thick_border_interval: int | str,
+    style: str,
+) -> None:
+    bordered = thick_border_interval != "x"
+    vertical = STYLE_DEFINITIONS[style]["vertical"]
+    if bordered:
+        write_border(out, "top", style, widths)
+    for column in range(row_count):
+        position = 0
+        pending_spaces = 0
+        if bordered:
+            out.write(vertical)
+        for run in runs:
+            cells = read_segment(spill, run, column)
+            run_widths = widths[position : position + len(cells)]
+            if bordered:
+                if position:
+                    out.write(vertical)
+                out.write(
+                    vertical.join(f" {pad_cell(cell, width)} " for cell, width in zip(cells, run_widths))
+                )
+            else:
+                # Mirror the in-memory ``.rstrip()`` by holding back trailing
+                # padding until more text follows it.
+                piece = " ".join(map(pad_cell, cells, run_widths))
+                if position:
+                    piece = " " + piece
+                text = piece.rstrip(" ")
+                if text:
+                    out.write(" " * pending_spaces)
+                    out.write(text)
+                    pending_spaces = len(piece) - len(text)
+                else:
+                    pending_spaces += len(piece)
+            position += len(cells)
+        if bordered:
+            out.write(vertical)
+        out.write("\n")
+        if bordered:
+            is_last = column == row_count - 1
+            write_border(out, border_name(column + 1, is_last, thick_border_interval), style, widths)
+
+
+def transpose_spilled(
+    rows: Iterable[list[str]],
+    out: TextIO,
+    *,
+    max_memory: int,
+    thick_border_interval: int | str = 3,
+    style: str = "t",
+) -> None:
+    """Transpose and render ``rows`` while holding at most ``max_memory`` bytes of them.
+
+    The output is identical to rendering ``transpose_rows(normalise_rows(rows))``.
+    When the whole input fits within the budget nothing is spilled.
+    """
+    widths = array("I")
+    column_count = 0
+    buffer: list[list[str]] = []
+    buffered = 0
+    runs: list[Run] = []
+    offset = 0
+    with tempfile.TemporaryFile(prefix="table_tool-") as spill:
+        for row in rows:
+            widths.append(max(map(display_width, row)))
+            column_count = max(column_count, len(row))
+            buffer.append(row)
+            buffered += ROW_OVERHEAD + CELL_OVERHEAD * len(row) + sum(map(len, row))
+            if buffered >= max_memory:
+                run, offset = write_run(spill, buffer, offset)
+                runs.append(run)
+                buffer = []
+                buffered = 0
+        if not widths:
+            raise ValueError("no rows found in the input")
+        if not runs:
+            plan = RenderPlan(widths, style=style, thick_border_interval=thick_border_interval)
+            for line in plan.iter_lines(transpose_rows(normalise_rows(buffer))):
+                out.write(line)
+                out.write("\n")
+            return
+        if buffer:
+            run, offset = write_run(spill, buffer, offset)
+            runs.append(run)
+            buffer = []
+        write_transposed(
+            spill,
+            runs,
+            widths,
+            column_count,
+            out,
+            thick_border_interval=thick_border_interval,
+            style=style,
+        )
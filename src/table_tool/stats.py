@@ -0,0 +1,119 @@
+"""Per-stage timing and memory statistics for a render.
+
+Pass a ``RenderStats`` to ``render_text`` or ``render_table`` (or use
+``--stats`` on the command line) to record, for each stage, wall-clock time,
+CPU time and the peak of memory traced by ``tracemalloc`` above the level at
+which the stage started. Table counters (rows, columns, cells, input and output
+bytes) are recorded alongside. Rendering functions skip all of this when no
+stats object is given.
+
+Input is read lazily, so reading and splitting lines is part of ``parse``.
+"""
+
+from __future__ import annotations
+
+import time
+import tracemalloc
+
+# Annotation-only imports; collections.abc is not needed at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from typing import TextIO
+
+STATS_FORMATS = ("text", "json")
+
+
+class _Stage:
+    __slots__ = ("stats", "name", "wall", "cpu", "base")
+
+    def __init__(self, stats: RenderStats, name: str) -> None:
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self) -> None:
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self.base = tracemalloc.get_traced_memory()[0]
+        else:
+            self.base = 0
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        peak = tracemalloc.get_traced_memory()[1] - self.base if tracemalloc.is_tracing() else 0
+        record = self.stats.stages.setdefault(
+            self.name, {"wall_s": 0.0, "cpu_s": 0.0, "peak_bytes": 0}
+        )
+        record["wall_s"] += wall
+        record["cpu_s"] += cpu
+        record["peak_bytes"] = max(record["peak_bytes"], peak)
+
+
+class RenderStats:
+    """Collects stage timings and table counters; see the module docstring.
+
+    Use it as a context manager to trace memory for the duration of a render;
+    outside one, only times and counters are recorded.
+    """
+
+    __slots__ = ("stages", "counts", "_owns_tracing")
+
+    def __init__(self) -> None:
+        self.stages: dict[str, dict[str, float]] = {}
+        self.counts: dict[str, int] = {}
+        self._owns_tracing = False
+
+    def __enter__(self) -> RenderStats:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def stage(self, name: str) -> _Stage:
+        """Return a context manager that adds its block to stage ``name``."""
+        return _Stage(self, name)
+
+    def count(self, **counts: int) -> None:
+        self.counts.update(counts)
+
+    def count_input(self, lines: Iterable[str]) -> Iterator[str]:
+        """Pass ``lines`` through, counting input lines and UTF-8 bytes."""
+        line_count = 0
+        byte_count = 0
+        for line in lines:
+            line_count += 1
+            byte_count += len(line) if line.isascii() else len(line.encode("utf-8"))
+            yield line
+        self.counts["input_lines"] = line_count
+        self.counts["input_bytes"] = byte_count
+
+    def as_dict(self) -> dict[str, object]:
+        return {"stages": self.stages, "counts": self.counts}
+
+    def format_text(self) -> str:
+        lines = [f"{'stage':<8} {'wall ms':>10} {'cpu ms':>10} {'peak KiB':>10}"]
+        for name, record in self.stages.items():
+            lines.append(
+                f"{name:<8} {record['wall_s'] * 1e3:>10.2f} {record['cpu_s'] * 1e3:>10.2f} "
+                f"{record['peak_bytes'] / 1024:>10.1f}"
+            )
+        lines.extend(f"{name}: {value}" for name, value in self.counts.items())
+        return "\n".join(lines)
+
+    def report(self, out: TextIO, *, format: str = "text") -> None:
+        """Write the statistics to ``out`` as a text table or one JSON line."""
+        if format == "json":
+            import json
+
+            out.write(json.dumps(self.as_dict()))
+        else:
+            out.write(self.format_text())
+        out.write("\n")
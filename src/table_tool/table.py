@@ -0,0 +1,235 @@
+"""An editable table that keeps its column widths and renderings up to date.
+
+``render_table`` measures every cell on every call. A ``Table`` instead keeps,
+for each column, a histogram of its cell widths, so appending, changing or
+deleting a row updates the column widths in time proportional to the row:
+when the widest cell goes away, the next width down is read off the
+histogram rather than found by re-measuring the column.
+
+Renderings are cached per style and border interval as one formatted line per
+row, plus the output lines with the borders in place. An edit that leaves
+every column width as it was re-formats only the rows it touched and swaps
+them into the output lines, so the new text is a single ``str.join`` away;
+one that changes a width drops the cached renderings, since every line
+changes with it. ``render`` returns exactly what ``render_table``
+returns for the same rows, padded to the same number of columns.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+
+from .render import RenderPlan
+from .width import display_width
+
+# Annotation-only imports; collections.abc is not needed at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+
+class _Rendering:
+    """One cached rendering: the formatted rows and, once assembled, every output line."""
+
+    __slots__ = ("plan", "lines", "parts", "text")
+
+    def __init__(self, plan: RenderPlan, lines: list[str]) -> None:
+        self.plan = plan
+        self.lines = lines
+        self.parts: list[str] | None = None
+        self.text: str | None = None
+
+    def render(self) -> str:
+        if self.text is None:
+            if self.parts is None:
+                self.parts = assemble(self.plan, self.lines)
+            self.text = "\n".join(self.parts)
+        return self.text
+
+    def replace_line(self, index: int, line: str) -> None:
+        index %= len(self.lines)
+        self.lines[index] = line
+        if self.parts is not None:
+            self.parts[part_index(self.plan, index)] = line
+        self.text = None
+
+    def append_line(self, line: str) -> None:
+        count = len(self.lines)
+        self.lines.append(line)
+        if self.parts is not None:
+            plan = self.plan
+            if plan.border_after(count, True) is not None:
+                self.parts.pop()
+            for part in (plan.border_after(count, False), line, plan.border_after(count + 1, True)):
+                if part is not None:
+                    self.parts.append(part)
+        self.text = None
+
+    def delete_line(self, index: int) -> None:
+        del self.lines[index]
+        # Every later row moves up, and with it the thick borders.
+        self.parts = None
+        self.text = None
+
+
+class Table:
+    """Rows of text cells with incrementally maintained widths; see the module docstring.
+
+    Rows may have different lengths; short rows render as if padded with empty
+    cells. Indexes follow list rules, so negative indexes count from the end.
+    """
+
+    __slots__ = ("_rows", "_column_widths", "_maxima", "_lengths", "_renderings")
+
+    def __init__(self, rows: Iterable[Sequence[str]] = ()) -> None:
+        self._rows: list[tuple[str, ...]] = []
+        # Per column: how many cells have each display width.
+        self._column_widths: list[Counter[int]] = []
+        self._maxima: list[int] = []
+        # How many rows have each length; the longest sets the column count.
+        self._lengths: Counter[int] = Counter()
+        self._renderings: dict[tuple[str, int | str], _Rendering] = {}
+        self.extend(rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[tuple[str, ...]]:
+        return iter(self._rows)
+
+    def __getitem__(self, index: int) -> tuple[str, ...]:
+        return self._rows[index]
+
+    def __delitem__(self, index: int) -> None:
+        self.delete_row(index)
+
+    def widths(self) -> list[int]:
+        """Return the display width of each column."""
+        return self._maxima[: self._column_count()]
+
+    def append(self, row: Sequence[str]) -> None:
+        before = self.widths()
+        cells = tuple(row)
+        self._rows.append(cells)
+        self._lengths[len(cells)] += 1
+        for column, cell in enumerate(cells):
+            self._add_width(column, display_width(cell))
+        if self.widths() != before:
+            self._renderings.clear()
+            return
+        for rendering in self._renderings.values():
+            rendering.append_line(self._format(rendering.plan, cells))
+
+    def extend(self, rows: Iterable[Sequence[str]]) -> None:
+        for row in rows:
+            self.append(row)
+
+    def set_cell(self, row: int, column: int, value: str) -> None:
+        """Replace one cell; a column past the end of a short row extends the row."""
+        cells = self._rows[row]
+        if column < 0:
+            raise IndexError("column index must not be negative")
+        if column < len(cells) and cells[column] == value:
+            return
+        before = self.widths()
+        if column < len(cells):
+            self._remove_width(column, display_width(cells[column]))
+            cells = (*cells[:column], value, *cells[column + 1 :])
+        else:
+            self._lengths[len(cells)] -= 1
+            if not self._lengths[len(cells)]:
+                del self._lengths[len(cells)]
+            for filler in range(len(cells), column):
+                self._add_width(filler, 0)
+            cells = (*cells, *[""] * (column - len(cells)), value)
+            self._lengths[len(cells)] += 1
+        self._add_width(column, display_width(value))
+        self._rows[row] = cells
+        self._refresh(before, row, cells)
+
+    def delete_row(self, index: int) -> None:
+        before = self.widths()
+        cells = self._rows.pop(index)
+        self._lengths[len(cells)] -= 1
+        if not self._lengths[len(cells)]:
+            del self._lengths[len(cells)]
+        for column, cell in enumerate(cells):
+            self._remove_width(column, display_width(cell))
+        if self.widths() != before:
+            self._renderings.clear()
+            return
+        for rendering in self._renderings.values():
+            rendering.delete_line(index)
+
+    def render(self, *, style: str = "t", thick_border_interval: int | str = 3) -> str:
+        """Render the table; unchanged rows are taken from the cache.
+
+        A table without rows raises ValueError, as ``render_text`` does.
+        """
+        if not self._rows:
+            raise ValueError("the table has no rows")
+        key = (style, thick_border_interval)
+        rendering = self._renderings.get(key)
+        if rendering is None:
+            plan = RenderPlan(self.widths(), style=style, thick_border_interval=thick_border_interval)
+            lines = [self._format(plan, cells) for cells in self._rows]
+            rendering = self._renderings[key] = _Rendering(plan, lines)
+        return rendering.render()
+
+    def _column_count(self) -> int:
+        return max(self._lengths, default=0)
+
+    def _format(self, plan: RenderPlan, cells: tuple[str, ...]) -> str:
+        missing = len(plan.widths) - len(cells)
+        return plan.format_row((*cells, *[""] * missing) if missing else cells)
+
+    def _add_width(self, column: int, width: int) -> None:
+        if column == len(self._column_widths):
+            self._column_widths.append(Counter())
+            self._maxima.append(0)
+        self._column_widths[column][width] += 1
+        if width > self._maxima[column]:
+            self._maxima[column] = width
+
+    def _remove_width(self, column: int, width: int) -> None:
+        counts = self._column_widths[column]
+        counts[width] -= 1
+        if not counts[width]:
+            del counts[width]
+            if width == self._maxima[column]:
+                self._maxima[column] = max(counts, default=0)
+
+    def _refresh(self, before: list[int], row: int, cells: tuple[str, ...]) -> None:
+        if self.widths() != before:
+            self._renderings.clear()
+            return
+        for rendering in self._renderings.values():
+            rendering.replace_line(row, self._format(rendering.plan, cells))
+
+
+def assemble(plan: RenderPlan, lines: Sequence[str]) -> list[str]:
+    """Interleave formatted row lines with the plan's borders, as ``RenderPlan.iter_lines`` does."""
+    if plan.thick_border_interval == "x":
+        return list(lines)
+    parts = [plan.borders["top"]]
+    last = len(lines)
+    for row_index, line in enumerate(lines, 1):
+        parts.append(line)
+        border = plan.border_after(row_index, row_index == last)
+        if border is not None:
+            parts.append(border)
+    return parts
+
+
+def part_index(plan: RenderPlan, index: int) -> int:
+    """Return where the line of the 0-based row ``index`` sits in ``assemble``'s output."""
+    interval = plan.thick_border_interval
+    if interval == "x":
+        return index
+    assert isinstance(interval, int)
+    # Middle borders below the rows above this one, thick and thin.
+    thick = index // interval if interval > 0 else 0
+    borders = thick * (plan.borders["middle_thick"] is not None) + (index - thick) * (
+        plan.borders["middle_thin"] is not None
+    )
+    return 1 + index + borders
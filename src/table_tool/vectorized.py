@@ -0,0 +1,34 @@
+"""Optional NumPy reductions over columnar width data.
+
+``numpy_row_widths`` computes the widest cell of every row (the column widths
+of a transposed table) by gathering each column's per-value widths through its
+code array and taking an element-wise maximum, with no per-cell Python work.
+The code arrays are shared with NumPy, not copied. Without NumPy it returns
+None and callers fall back to the pure-Python loop.
+"""
+
+from __future__ import annotations
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without NumPy
+    np = None
+
+# Annotation-only imports; collections.abc is not needed at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from .columnar import Column
+
+
+def numpy_row_widths(columns: Sequence[Column]) -> list[int] | None:
+    if np is None:
+        return None
+    widths = None
+    for column in columns:
+        column.measure()
+        codes = np.frombuffer(column.codes, dtype=np.dtype(f"u{column.codes.itemsize}"))
+        cell_widths = np.asarray(column.value_widths, dtype=np.int64)[codes]
+        widths = cell_widths if widths is None else np.maximum(widths, cell_widths, out=widths)
+    return [] if widths is None else widths.tolist()
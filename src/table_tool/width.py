@@ -0,0 +1,61 @@
+"""Display-width measurement for table cells.
+
+Printable ASCII text is measured with ``len`` and never reaches wcwidth. Other
+text goes through a bounded memo, so repeated values (and the second lookup
+made while padding a cell) cost a dictionary hit instead of a wcwidth scan.
+wcwidth itself is only imported the first time non-ASCII text is measured.
+
+The memo is a plain dictionary shared by all threads and emptied when it
+fills up. A hit is a lone ``dict.get``, which free-threaded builds serve
+without taking a lock; unlike ``functools.lru_cache`` it does not reorder
+anything on a hit, so threads measuring the same values do not contend. Two
+threads missing on the same text both measure it and store the same width.
+"""
+
+from __future__ import annotations
+
+WIDTH_CACHE_SIZE = 65536
+
+_wide_widths: dict[str, int] = {}
+
+
+def display_width(text: str) -> int:
+    """Return the printable width of a string, treating wide characters appropriately."""
+    if text.isascii() and text.isprintable():
+        return len(text)
+    width = _wide_widths.get(text)
+    if width is not None:
+        return width
+    if "\n" in text:
+        # A multi-line CSV field is as wide as its widest line.
+        return max(map(display_width, text.split("\n")))
+    return _wide_text_width(text)
+
+
+def _wide_text_width(text: str) -> int:
+    width = _wcswidth(text)
+    if len(_wide_widths) >= WIDTH_CACHE_SIZE:
+        _wide_widths.clear()
+    _wide_widths[text] = width
+    return width
+
+
+def _wcswidth(text: str) -> int:
+    # Replaces itself with the wcwidth-backed version on first use.
+    global _wcswidth
+    from wcwidth import wcswidth
+
+    def measure(text: str) -> int:
+        width = wcswidth(text)
+        return width if width >= 0 else len(text)
+
+    _wcswidth = measure
+    return measure(text)
+
+
+def measure_widths(texts: list[str]) -> list[int]:
+    """Return ``display_width`` of every text, checking for plain ASCII in bulk."""
+    joined = "".join(texts)
+    if joined.isascii() and joined.isprintable():
+        return list(map(len, texts))
+    return list(map(display_width, texts))
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pytest
+
+from table_tool.cli import column_widths, normalise_rows, transpose_rows
+from table_tool.columnar import ColumnarTable
+from table_tool.render import pad_cell
+
+
+def test_ragged_rows_are_padded_virtually() -> None:
+    rows = [["a", "bb"], ["名前"], ["c", "d", "eee"]]
+
+    table = ColumnarTable.from_rows(rows)
+    expected = normalise_rows(rows)
+
+    assert [list(row) for row in table.iter_rows()] == expected
+    assert table.widths() == column_widths(expected)
+    assert list(table.iter_columns()) == transpose_rows(expected)
+    assert table.row_widths() == column_widths(transpose_rows(expected))
+
+
+def test_repeated_values_share_one_dictionary_entry() -> None:
+    table = ColumnarTable.from_rows([["eu", "ok"], ["us", "ok"], ["eu", "ok"]] * 100)
+
+    region, status = table.columns
+
+    assert region.values == ["", "eu", "us"]
+    assert status.values == ["", "ok"]
+    assert region.codes.itemsize == 1
+
+
+def test_codes_widen_past_one_byte() -> None:
+    table = ColumnarTable.from_rows([[str(idx)] for idx in range(300)])
+
+    assert table.columns[0].codes.itemsize == 2
+    assert [row[0] for row in table.iter_rows()] == [str(idx) for idx in range(300)]
+
+
+def test_padded_rows_match_padding_each_cell() -> None:
+    table = ColumnarTable.from_rows([["a", "名前"], ["bbb"], ["", "x"]])
+    widths = table.widths()
+
+    assert [list(row) for row in table.iter_padded_rows(widths)] == [
+        [pad_cell(cell, width) for cell, width in zip(row, widths)]
+        for row in table.iter_rows()
+    ]
+
+
+def test_numpy_row_widths_match_the_python_loop() -> None:
+    pytest.importorskip("numpy")
+    from table_tool.vectorized import numpy_row_widths
+
+    rows = [[str(idx % 7) * (idx % 5), "名" * (idx % 3)] for idx in range(400)]
+    rows.append(["x" * 20])
+    table = ColumnarTable.from_rows(rows)
+    expected = column_widths(transpose_rows(normalise_rows(rows)))
+
+    assert numpy_row_widths(table.columns) == expected
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SRC_PATH = PROJECT_ROOT / "src"
+
+# Cumulative -X importtime budget for the rendering core, in microseconds. It
+# imports in a few milliseconds today; the budget leaves room for slow machines
+# while still catching an accidental heavy import.
+RENDER_IMPORT_BUDGET_US = 25_000
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Import ``module`` in a fresh interpreter and return cumulative times by module.
+
+    A first import writes the bytecode caches, so the timed import measures
+    loading the package rather than compiling it.
+    """
+    env = os.environ.copy()
+    env["PYTHONPATH"] = str(SRC_PATH)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True, env=env)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_render_core_import_stays_within_budget() -> None:
+    times = import_times("table_tool.render")
+
+    for heavy in ("argparse", "pathlib", "typing", "wcwidth", "table_tool.cli"):
+        assert heavy not in times
+    assert times["table_tool.render"] < RENDER_IMPORT_BUDGET_US
+
+
+def test_package_import_defers_the_command_line() -> None:
+    times = import_times("table_tool")
+
+    assert "table_tool.cli" not in times
+    assert "argparse" not in times
+
+
+def test_input_layer_does_not_import_the_command_line() -> None:
+    for module in ("table_tool.inputs", "table_tool.rawremove", "table_tool.slicing"):
+        times = import_times(module)
+
+        assert "table_tool.cli" not in times
+        assert "argparse" not in times
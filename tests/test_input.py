@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+import threading
+from pathlib import Path
+
+import pytest
+
+from table_tool.compressed import detect_compression, iter_decompressed_lines
+from table_tool.inputs import iter_mapped_lines, load_lines, remove_table
+from table_tool.output import BufferedTextWriter, open_output
+from table_tool.rawremove import iter_blocks, remove_block, remove_table_bytes
+from table_tool.render import sniff_style
+
+TRICKY_TEXT = "a|b\r\nc|d\rlong line|with 名前\n\nx\x0cy z\nlast|no newline"
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 7, 1 << 20])
+def test_mapped_lines_match_read_text(tmp_path: Path, block_size: int) -> None:
+    path = tmp_path / "tricky.txt"
+    path.write_bytes(TRICKY_TEXT.encode("utf-8"))
+
+    expected = path.read_text(encoding="utf-8").splitlines(keepends=True)
+
+    assert list(iter_mapped_lines(path, block_size=block_size)) == expected
+
+
+def test_mapped_lines_byte_range(tmp_path: Path) -> None:
+    path = tmp_path / "range.txt"
+    path.write_bytes(b"one\ntwo\nthree\n")
+
+    assert list(iter_mapped_lines(path, 4, 8)) == ["two\n"]
+
+
+def test_load_lines_handles_empty_regular_file(tmp_path: Path) -> None:
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+
+    assert list(load_lines(str(path))) == []
+
+
+def test_sniff_style_reads_only_until_first_border() -> None:
+    consumed: list[str] = []
+
+    def lines():
+        for line in ["title\n", "│ a │\n", "│ b │\n"]:
+            consumed.append(line)
+            yield line
+        raise AssertionError("read past the look-ahead")
+
+    style, replay = sniff_style(lines(), lookahead=2)
+
+    assert style == "g"
+    assert consumed == ["title\n", "│ a │\n"]
+    assert next(replay) == "title\n"
+
+
+@pytest.mark.parametrize(
+    ("text", "style"),
+    [
+        ("intro\n+---+----+\n| a | bb |\n+===+====+\n|   | c  |\n+---+----+\n|\n||\n", None),
+        ("| a | b |\n|\n| c | d |\n\n  | not a row |\n|tab\t|\t x|\n", "m"),
+        ("| x | 名前 |\n| y | z |\n", None),
+        ("┌───┐\n│ a │\n└───┘\n", None),
+        ("| a | b |\r\n| c\x0bd | e |\x0b|f|\n", None),
+        ("no table here\n", "t"),
+    ],
+)
+def test_bytes_remove_matches_text_remove(tmp_path: Path, text: str, style: str | None) -> None:
+    path = tmp_path / "table.txt"
+    path.write_bytes(text.encode("utf-8"))
+
+    def run(remove) -> tuple[bytes, str | None]:
+        raw = io.BytesIO()
+        out = BufferedTextWriter(raw)
+        try:
+            remove(out)
+        except ValueError as exc:
+            return raw.getvalue(), str(exc)
+        out.flush()
+        return raw.getvalue(), None
+
+    expected = run(lambda out: remove_table(load_lines(str(path)), out, delimiter=",", style=style))
+    actual = run(lambda out: remove_table_bytes(str(path), out, delimiter=",", style=style))
+
+    assert actual == expected
+
+
+def test_bytes_remove_blocks_end_on_newlines() -> None:
+    data = b"".join(b"| %d | value %d |\n" % (idx, idx) for idx in range(500))
+
+    blocks = list(iter_blocks(io.BytesIO(data), block_size=100, first_lines=64))
+
+    assert b"".join(blocks) == data
+    assert blocks[0].count(b"\n") >= 64
+    assert all(block.endswith(b"\n") for block in blocks)
+    rows = b"".join(remove_block(block, b",") for block in blocks)
+    assert rows == b"".join(b"%d,value %d\n" % (idx, idx) for idx in range(500))
+
+
+def test_bytes_remove_falls_back_for_text_only_stdin(monkeypatch: pytest.MonkeyPatch) -> None:
+    # The client server hands main a StringIO, which has no buffer or encoding.
+    monkeypatch.setattr("sys.stdin", io.StringIO("| a | b |\n| c | d |\n"))
+    raw = io.BytesIO()
+    out = BufferedTextWriter(raw)
+
+    remove_table_bytes("-", out)
+    out.flush()
+
+    assert raw.getvalue() == b"a|b\nc|d\n"
+
+
+COMPRESSORS = {"gz": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+
+
+@pytest.mark.parametrize("compression", sorted(COMPRESSORS))
+@pytest.mark.parametrize("background", [True, False])
+def test_compressed_lines_match_plain_lines(
+    tmp_path: Path, compression: str, background: bool
+) -> None:
+    data = TRICKY_TEXT.encode("utf-8")
+    packed = COMPRESSORS[compression](data)
+    plain = tmp_path / "plain.txt"
+    plain.write_bytes(data)
+    # Detection goes by content, so the name is deliberately misleading.
+    path = tmp_path / "packed.txt"
+    path.write_bytes(packed)
+
+    assert detect_compression(packed) == compression
+    assert list(load_lines(str(path))) == list(iter_mapped_lines(plain))
+    lines = iter_decompressed_lines(
+        io.BytesIO(packed), compression, split_lines=False, background=background, block_size=3
+    )
+    # Standard input on POSIX splits on "\n" only.
+    assert list(lines) == list(io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", newline="\n"))
+
+
+def test_compressed_stdin_splits_like_plain_stdin(monkeypatch: pytest.MonkeyPatch) -> None:
+    data = b"a|b\rc|d\r\ne|f\n"
+
+    def stdin_lines(raw: bytes) -> list[str]:
+        buffer = io.BufferedReader(io.BytesIO(raw))
+        monkeypatch.setattr("sys.stdin", io.TextIOWrapper(buffer, encoding="utf-8", newline="\n"))
+        return list(load_lines("-"))
+
+    assert stdin_lines(gzip.compress(data)) == stdin_lines(data) == ["a|b\rc|d\r\n", "e|f\n"]
+
+
+def test_corrupt_compressed_input_is_reported() -> None:
+    packed = gzip.compress(b"a|b\n" * 1000)[:-20]
+
+    with pytest.raises(ValueError, match="cannot decompress the gz input"):
+        list(iter_decompressed_lines(io.BytesIO(packed), "gz"))
+
+
+def test_closing_compressed_lines_stops_the_reader_thread() -> None:
+    packed = gzip.compress(b"a|b\n" * 100_000)
+    before = threading.active_count()
+
+    lines = iter_decompressed_lines(io.BytesIO(packed), "gz", background=True, block_size=64)
+    assert next(lines) == "a|b\n"
+    assert threading.active_count() == before + 1
+    lines.close()
+
+    assert threading.active_count() == before
+
+
+def test_compressed_output_round_trips() -> None:
+    raw = io.BytesIO()
+    stream = io.TextIOWrapper(raw, encoding="utf-8")
+    out = open_output(stream, buffer_size=4, compression="xz")
+
+    out.write_lines(["名前|a", "b|c"])
+    out.close()
+
+    assert not raw.closed
+    assert lzma.decompress(raw.getvalue()) == "名前|a\nb|c\n".encode("utf-8")
+
+
+def test_bytes_remove_keeps_carriage_returns_on_stdin(monkeypatch: pytest.MonkeyPatch) -> None:
+    data = b"| a\r\n| b |\r\n|c|\r|d|\n| e | f |\n"
+
+    def run(remove) -> bytes:
+        # Standard input on POSIX splits on "\n" only and keeps "\r".
+        monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(data), newline="\n"))
+        raw = io.BytesIO()
+        out = BufferedTextWriter(raw)
+        remove(out)
+        out.flush()
+        return raw.getvalue()
+
+    expected = run(lambda out: remove_table(load_lines("-"), out, delimiter=","))
+
+    assert run(lambda out: remove_table_bytes("-", out, delimiter=",")) == expected
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from table_tool import RenderPlan
+from table_tool.cli import STYLE_DEFINITIONS, column_widths, render_table
+
+
+def test_plan_matches_render_table_for_every_layout() -> None:
+    rows = [["h1", "名前"], ["1", "x"], ["2", "yy"], ["3", "zzz"]]
+    widths = column_widths(rows)
+
+    for style in ("m", "t", "g"):
+        for interval in (0, 2, "x"):
+            plan = RenderPlan(widths, style=style, thick_border_interval=interval)
+
+            assert plan.render(rows) == render_table(
+                rows, style=style, thick_border_interval=interval
+            )
+
+
+def test_plan_is_reusable_across_tables() -> None:
+    plan = RenderPlan([2, 3], style="g", thick_border_interval=0)
+
+    first = plan.render([["a", "b"]])
+    second = plan.render([["cc", "ddd"], ["e", "f"]])
+
+    assert first.splitlines()[0] == "┌────┬─────┐"
+    assert second.splitlines()[1] == "│ cc │ ddd │"
+    assert plan.border_after(1, is_last=False) == "├────┼─────┤"
+    assert plan.render([["a", "b"]]) == first
+
+
+def test_style_definitions_are_read_only() -> None:
+    with pytest.raises(TypeError):
+        STYLE_DEFINITIONS["t"]["vertical"] = "!"  # type: ignore[index]
+    with pytest.raises(TypeError):
+        STYLE_DEFINITIONS["x"] = STYLE_DEFINITIONS["t"]  # type: ignore[index]
+
+
+def test_concurrent_renders_match_serial_output() -> None:
+    rows = [[f"{value}{idx}" for value in ("a", "東京", "서울")] for idx in range(200)]
+    expected = render_table(rows, style="g")
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: render_table(rows, style="g"), range(32)))
+
+    assert results == [expected] * 32
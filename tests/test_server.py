@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import threading
+from pathlib import Path
+
+import pytest
+
+from table_tool.server import execute_request, run_client, serve
+
+
+def test_request_paths_are_resolved_against_its_cwd(tmp_path: Path) -> None:
+    (tmp_path / "input.txt").write_text("a|b\n", encoding="utf-8")
+    before = os.getcwd()
+
+    response = execute_request({"argv": ["input.txt"], "cwd": str(tmp_path)})
+
+    assert response["status"] == 0
+    assert response["stdout"].splitlines()[1] == "| a | b |"
+    assert os.getcwd() == before
+
+
+def test_help_is_answered_like_the_command_line() -> None:
+    response = execute_request({"argv": ["--help"]})
+
+    assert response["status"] == 0
+    assert "--follow" in response["stdout"]
+    assert response["stderr"] == ""
+
+
+def test_client_reports_a_missing_reply(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    socket_path = str(tmp_path / "broken.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen()
+
+    def hang_up() -> None:
+        connection, _ = listener.accept()
+        with connection:
+            connection.makefile("rb").readline()
+
+    thread = threading.Thread(target=hang_up)
+    thread.start()
+    try:
+        status = run_client(["input.txt"], socket_path)
+    finally:
+        thread.join()
+        listener.close()
+
+    assert status == 1
+    assert "sent no reply" in capsys.readouterr().err
+
+
+def test_unsuitable_requests_are_refused(tmp_path: Path) -> None:
+    (tmp_path / "input.txt").write_text("a|b\n", encoding="utf-8")
+    request = {"argv": ["--suffix", ".tbl", "input.txt"], "cwd": str(tmp_path)}
+
+    batch = execute_request(request)
+    directory = execute_request({"argv": [str(tmp_path)]})
+    # An abbreviated option is recognised, as the command line would.
+    follow = execute_request({"argv": ["--fol", "input.txt"], "cwd": str(tmp_path)})
+    stats = execute_request({"argv": ["--stats", "input.txt"], "cwd": str(tmp_path)})
+
+    assert follow["status"] == 2
+    assert "--follow" in follow["stderr"]
+    assert stats["status"] == 2
+    assert "--stats" in stats["stderr"]
+    assert batch["status"] == 2
+    assert "batch mode" in batch["stderr"]
+    assert not (tmp_path / "input.txt.tbl").exists()
+    assert directory["status"] == 2
+    assert "not a regular file" in directory["stderr"]
+
+
+def test_slow_request_times_out_without_blocking_others(tmp_path: Path) -> None:
+    socket_path = str(tmp_path / "render.sock")
+    slow_input = "a|bb|ccc\n" * 600_000
+
+    async def ask(request: dict[str, object]) -> dict[str, object]:
+        reader, writer = await asyncio.open_unix_connection(socket_path, limit=1 << 26)
+        writer.write(json.dumps(request).encode("utf-8") + b"\n")
+        reply = json.loads(await reader.readline())
+        writer.close()
+        return reply
+
+    async def scenario() -> tuple[dict[str, object], dict[str, object]]:
+        server = asyncio.create_task(serve(socket_path, timeout=0.5))
+        while not os.path.exists(socket_path):
+            await asyncio.sleep(0.01)
+        slow = asyncio.create_task(ask({"argv": ["-"], "stdin": slow_input}))
+        fast = await ask({"argv": ["-"], "stdin": "x|y\n"})
+        assert not slow.done()
+        slow_reply = await slow
+        # The server stops on SIGTERM even though the slow render may still run.
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.wait_for(server, 5)
+        return slow_reply, fast
+
+    slow, fast = asyncio.run(scenario())
+
+    assert fast["status"] == 0
+    assert fast["stdout"].splitlines()[1] == "| x | y |"
+    assert slow["status"] == 1
+    assert "took longer than 0.5 seconds" in slow["stderr"]
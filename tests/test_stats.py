@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import io
+import json
+
+from table_tool.render import render_text
+from table_tool.stats import RenderStats
+
+
+def test_stats_record_stages_and_counts_without_changing_output() -> None:
+    lines = ["a|bb|c\n", "名|2\n", "\n"]
+
+    with RenderStats() as stats:
+        table = render_text(lines, stats=stats)
+
+    assert table == render_text(lines)
+    assert list(stats.stages) == ["parse", "measure", "render"]
+    assert all(record["peak_bytes"] > 0 for record in stats.stages.values())
+    assert stats.counts == {
+        "input_lines": 3,
+        "input_bytes": 14,
+        "rows": 2,
+        "columns": 3,
+        "cells": 6,
+        "output_bytes": len(table.encode("utf-8")),
+    }
+
+
+def test_stats_count_the_transposed_table() -> None:
+    stats = RenderStats()
+
+    render_text(["a|b|c\n", "d|e|f\n"], transpose=True, stats=stats)
+
+    assert stats.counts["rows"] == 3
+    assert stats.counts["columns"] == 2
+    assert stats.counts["cells"] == 6
+
+
+def test_stats_report_as_json() -> None:
+    stats = RenderStats()
+    render_text(["x|y\n"], stats=stats)
+    out = io.StringIO()
+
+    stats.report(out, format="json")
+
+    report = json.loads(out.getvalue())
+    assert report["counts"]["rows"] == 1
+    assert report["stages"]["parse"]["peak_bytes"] == 0
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import json
 import os
+import select
+import signal
 import subprocess
 import sys
+import time
 from pathlib import Path
 
 import pytest
@@ -312,3 +316,514 @@ def test_remove_unicode_table_with_custom_delimiter(tmp_path: Path) -> None:
     assert result.returncode == 0
     assert result.stdout == expected_output
     assert result.stderr == ""
+
+
+def test_stream_matches_in_memory_render(tmp_path: Path) -> None:
+    input_path = tmp_path / "ragged.txt"
+    input_path.write_text(
+        "h1|h2|h3\n1|2\n\n名前|x|y|extra\n3|4|5\n6\n", encoding="utf-8"
+    )
+
+    for options in ([], ["-b", "2"], ["-b", "x"], ["-s", "m"], ["-s", "g"]):
+        expected = run_script(*options, str(input_path))
+        result = run_script("--stream", *options, str(input_path))
+
+        assert result.returncode == 0
+        assert result.stdout == expected.stdout
+        assert result.stderr == ""
+
+
+def test_sample_writes_rows_before_the_input_ends() -> None:
+    env = {**os.environ, "PYTHONPATH": str(SRC_PATH)}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "table_tool", "--sample", "1", "-"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        env=env,
+    )
+    assert process.stdin is not None and process.stdout is not None
+    live = b""
+    try:
+        process.stdin.write(b"a|b\n1|2\n")
+        process.stdin.flush()
+        deadline = time.monotonic() + 10
+        # The input stays open: the rows must arrive without waiting for its end.
+        while b"| 1 | 2 |" not in live and time.monotonic() < deadline:
+            if select.select([process.stdout], [], [], 0.1)[0]:
+                live += os.read(process.stdout.fileno(), 4096)
+    finally:
+        process.stdin.close()
+        rest = process.stdout.read()
+        process.wait(timeout=10)
+
+    assert b"| 1 | 2 |" in live
+    assert rest == b"+---+---+\n"
+
+
+def test_stream_rejects_piped_stdin() -> None:
+    result = run_script("--stream", "-", input_data="a|b\n")
+
+    assert result.returncode == 1
+    assert "seekable" in result.stderr
+
+
+def test_sample_fixes_widths_and_truncates() -> None:
+    result = run_script(
+        "--sample",
+        "1",
+        "-b",
+        "0",
+        "-",
+        input_data="id|name\n1|a much longer name|extra\n",
+    )
+
+    expected_output = "\n".join(
+        [
+            "+----+------+",
+            "| id | name |",
+            "+----+------+",
+            "| 1  | a m… |",
+            "+----+------+",
+            "",
+        ]
+    )
+
+    assert result.returncode == 0
+    assert result.stdout == expected_output
+    assert result.stderr == ""
+
+
+def test_max_width_wraps_cells(tmp_path: Path) -> None:
+    input_path = tmp_path / "wrap.txt"
+    input_path.write_text("k|value\na|長い名前\n", encoding="utf-8")
+
+    result = run_script("--max-width", "4", "--overflow", "wrap", "-b", "0", str(input_path))
+
+    expected_output = "\n".join(
+        [
+            "+---+------+",
+            "| k | valu |",
+            "|   | e    |",
+            "+---+------+",
+            "| a | 長い |",
+            "|   | 名前 |",
+            "+---+------+",
+            "",
+        ]
+    )
+
+    assert result.returncode == 0
+    assert result.stdout == expected_output
+    assert result.stderr == ""
+
+
+def test_parallel_jobs_match_serial_output(tmp_path: Path) -> None:
+    input_path = tmp_path / "many.txt"
+    lines = [f"{idx}|{'x' * (idx % 7)}|名{idx}" + ("|extra" if idx == 17 else "") for idx in range(40)]
+    lines.insert(10, "")
+    input_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    for options in ([], ["-b", "4"], ["-b", "x"], ["-s", "m"], ["-s", "g", "-b", "0"]):
+        expected = run_script(*options, str(input_path))
+        result = run_script("-j", "3", *options, str(input_path))
+
+        assert result.returncode == 0
+        assert result.stdout == expected.stdout
+        assert result.stderr == ""
+
+
+def test_spilled_transpose_matches_in_memory(tmp_path: Path) -> None:
+    input_path = tmp_path / "wide.txt"
+    input_path.write_text("a|bb|c\n1|名前\n\nxyz|2|3|4\n5||6\n", encoding="utf-8")
+
+    for options in ([], ["-b", "2"], ["-b", "x"], ["-s", "m"], ["-s", "g"]):
+        expected = run_script("-t", *options, str(input_path))
+        # A one-byte budget spills every row into its own run.
+        for budget in ("1", "1M"):
+            result = run_script("-t", "--max-memory", budget, *options, str(input_path))
+
+            assert result.returncode == 0
+            assert result.stdout == expected.stdout
+            assert result.stderr == ""
+
+
+def test_max_memory_requires_transpose(tmp_path: Path) -> None:
+    input_path = tmp_path / "data.txt"
+    input_path.write_text("a|b\n", encoding="utf-8")
+
+    result = run_script("--max-memory", "1M", str(input_path))
+
+    assert result.returncode == 2
+    assert "only applies to -t" in result.stderr
+
+
+def test_remove_streams_rows_after_leading_text() -> None:
+    table_text = "\n".join(
+        [
+            "Report for today",
+            "┌────┬────┐",
+            "│ h1 │ r1 │",
+            "╞════╪════╡",
+            "│ 名 │    │",
+            "└────┴────┘",
+            "",
+        ]
+    )
+
+    result = run_script("-r", "-", input_data=table_text)
+
+    assert result.returncode == 0
+    assert result.stdout == "h1|r1\n名|\n"
+    assert result.stderr == ""
+
+
+def test_compressed_input_and_output(tmp_path: Path) -> None:
+    import gzip
+    import lzma
+
+    plain = tmp_path / "data.txt"
+    plain.write_text("name|qty\napple|3\n", encoding="utf-8")
+    packed = tmp_path / "data.xz"
+    packed.write_bytes(lzma.compress(plain.read_bytes()))
+    expected = run_script(str(plain)).stdout
+
+    rendered = run_script(str(packed))
+    tail = run_script("--tail", "1", str(packed))
+    batch = run_script(str(packed), "--suffix", ".gz", "--compress", "gz")
+    table = tmp_path / "table.gz"
+    table.write_bytes(gzip.compress(expected.encode("utf-8")))
+    removed = run_script("-r", str(table))
+    index = run_script("--index", str(tmp_path / "idx"), str(packed))
+
+    assert rendered.returncode == 0
+    assert rendered.stdout == expected
+    assert tail.stdout == "+-------+---+\n| apple | 3 |\n+-------+---+\n"
+    assert batch.returncode == 0
+    assert gzip.decompress((tmp_path / "data.xz.gz").read_bytes()).decode("utf-8") == expected
+    assert removed.stdout == "name|qty\napple|3\n"
+    assert index.returncode == 1
+    assert "compressed" in index.stderr
+
+
+def test_emit_writes_several_formats_from_one_run(tmp_path: Path) -> None:
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("name|qty\na<b|3\nc|12\nd|\n", encoding="utf-8")
+    targets = {name: tmp_path / f"out.{name}" for name in ("g", "x", "markdown", "html", "tsv")}
+
+    result = run_script(
+        str(input_path),
+        "-b",
+        "2",
+        *(arg for name, path in targets.items() for arg in ("--emit", f"{name}:{path}")),
+        "--emit",
+        "t:-",
+    )
+
+    assert result.returncode == 0
+    assert result.stdout == run_script("-b", "2", str(input_path)).stdout
+    outputs = {name: path.read_text(encoding="utf-8") for name, path in targets.items()}
+    assert outputs["g"] == run_script("-b", "2", "-s", "g", str(input_path)).stdout
+    assert outputs["x"] == run_script("-b", "x", str(input_path)).stdout
+    assert outputs["markdown"] == (
+        "| name | qty |\n| ---- | --- |\n| a<b  | 3   |\n| c    | 12  |\n| d    |     |\n"
+    )
+    assert outputs["html"].splitlines()[2:5] == [
+        "<tr><th>name</th><th>qty</th></tr>",
+        "</thead>",
+        "<tbody>",
+    ]
+    assert "<tr><td>a&lt;b</td><td>3</td></tr>" in outputs["html"]
+    assert outputs["tsv"] == "name\tqty\na<b\t3\nc\t12\nd\t\n"
+
+
+def test_emit_markdown_pads_the_escaped_cells(tmp_path: Path) -> None:
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("name,note\nx,a|bc\nyy,c\\\n", encoding="utf-8")
+    markdown = tmp_path / "out.md"
+    transposed = tmp_path / "transposed.md"
+
+    result = run_script(str(input_path), "-d", ",", "--emit", f"markdown:{markdown}")
+    run_script(str(input_path), "-d", ",", "-t", "--emit", f"markdown:{transposed}")
+
+    assert result.returncode == 0
+    assert markdown.read_text(encoding="utf-8") == (
+        "| name | note  |\n| ---- | ----- |\n| x    | a\\|bc |\n| yy   | c\\\\   |\n"
+    )
+    assert transposed.read_text(encoding="utf-8") == (
+        "| name | x     | yy  |\n| ---- | ----- | --- |\n| note | a\\|bc | c\\\\ |\n"
+    )
+
+
+def test_batch_renders_each_file_and_reports_failures(tmp_path: Path) -> None:
+    (tmp_path / "one.txt").write_text("a|b\n1|2\n", encoding="utf-8")
+    (tmp_path / "two.txt").write_text("x|yy\n", encoding="utf-8")
+    (tmp_path / "empty.txt").write_text("\n", encoding="utf-8")
+    out_dir = tmp_path / "out"
+
+    result = run_script(str(tmp_path / "*.txt"), "-o", str(out_dir), "-b", "0")
+
+    assert result.returncode == 1
+    assert "empty.txt: no rows found" in result.stderr
+    assert "1 of 3 files failed" in result.stderr
+    assert sorted(path.name for path in out_dir.iterdir()) == ["one.txt", "two.txt"]
+    assert (out_dir / "two.txt").read_text(encoding="utf-8") == "\n".join(
+        ["+---+----+", "| x | yy |", "+---+----+", ""]
+    )
+
+
+def test_batch_manifest_from_stdin_with_suffix(tmp_path: Path) -> None:
+    sources = [tmp_path / "one.txt", tmp_path / "two.txt"]
+    for path in sources:
+        path.write_text("k|v\n", encoding="utf-8")
+
+    result = run_script(
+        "--manifest", "-", "--suffix", ".tbl", "-j", "2",
+        input_data="".join(f"{path}\n" for path in sources),
+    )
+
+    assert result.returncode == 0
+    assert result.stderr == ""
+    for path in sources:
+        rendered = path.with_name(path.name + ".tbl").read_text(encoding="utf-8")
+        assert rendered.splitlines()[1] == "| k | v |"
+
+
+def test_batch_suffix_template_and_shared_outputs(tmp_path: Path) -> None:
+    for directory in ("d1", "d2"):
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / "x.txt").write_text(f"{directory}|v\n", encoding="utf-8")
+    (tmp_path / "d1" / "y.txt").write_text("y|v\n", encoding="utf-8")
+    out_dir = tmp_path / "out"
+
+    templated = run_script(str(tmp_path / "d1" / "*.txt"), "--suffix", "{stem}.table")
+    shared = run_script(
+        str(tmp_path / "d1" / "x.txt"),
+        str(tmp_path / "d2" / "x.txt"),
+        str(tmp_path / "d1" / "y.txt"),
+        "-o", str(out_dir), "-j", "2",
+    )
+    invalid = run_script(str(tmp_path / "d1" / "x.txt"), "--suffix", "{size}")
+
+    assert templated.returncode == 0
+    assert (tmp_path / "d1" / "x.table").read_text(encoding="utf-8").splitlines()[1] == (
+        "| d1 | v |"
+    )
+    assert (tmp_path / "d1" / "y.table").exists()
+    assert shared.returncode == 1
+    assert "would also be written for" in shared.stderr
+    assert "2 of 3 files failed" in shared.stderr
+    assert sorted(path.name for path in out_dir.iterdir()) == ["y.txt"]
+    assert invalid.returncode == 2
+    assert "invalid suffix template" in invalid.stderr
+
+
+def test_client_output_matches_direct_run(tmp_path: Path) -> None:
+    socket_path = tmp_path / "render.sock"
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("a|bb\n名|2\n", encoding="utf-8")
+    env = {**os.environ, "PYTHONPATH": str(SRC_PATH)}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "table_tool", "serve", "--socket", str(socket_path)],
+        env=env,
+    )
+    try:
+        for _ in range(200):
+            if socket_path.exists():
+                break
+            time.sleep(0.05)
+        direct = run_script("-s", "g", str(input_path))
+        served = run_script("client", "--socket", str(socket_path), "-s", "g", str(input_path))
+        piped = run_script("client", "--socket", str(socket_path), "-", input_data="x|y\n")
+        missing = run_script("client", "--socket", str(socket_path), str(tmp_path / "nope"))
+        followed = run_script("client", "--socket", str(socket_path), "--follow", str(input_path))
+        after = run_script("client", "--socket", str(socket_path), str(input_path))
+        helped = run_script("client", "--socket", str(socket_path), "--help")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    assert served.returncode == 0
+    assert served.stdout == direct.stdout
+    assert piped.stdout.splitlines()[1] == "| x | y |"
+    assert missing.returncode == 1
+    assert "does not exist" in missing.stderr
+    assert followed.returncode == 2
+    assert "--follow" in followed.stderr
+    assert after.stdout == run_script(str(input_path)).stdout
+    assert helped.returncode == 0
+    assert "--follow" in helped.stdout
+    assert helped.stderr == ""
+    assert not socket_path.exists()
+
+
+def test_client_renders_in_process_without_server(tmp_path: Path) -> None:
+    result = run_script(
+        "client", "--socket", str(tmp_path / "absent.sock"), "-", input_data="k|v\n"
+    )
+
+    assert result.returncode == 0
+    assert result.stdout.splitlines()[1] == "| k | v |"
+
+
+def test_stats_are_reported_on_stderr(tmp_path: Path) -> None:
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("a|b\n1|2\n", encoding="utf-8")
+
+    result = run_script("--stats", "--stats-format", "json", str(input_path))
+
+    assert result.returncode == 0
+    assert result.stdout == run_script(str(input_path)).stdout
+    report = json.loads(result.stderr)
+    assert list(report["stages"]) == ["load", "parse", "measure", "render", "write"]
+    assert report["counts"]["rows"] == 2
+
+
+def test_index_extends_cached_output_for_appended_rows(tmp_path: Path) -> None:
+    input_path = tmp_path / "log.txt"
+    index_path = tmp_path / "log.idx"
+    input_path.write_text("name|n\nab|1\n", encoding="utf-8")
+    first = run_script("-b", "2", "--index", str(index_path), str(input_path))
+    assert first.stdout == run_script("-b", "2", str(input_path)).stdout
+
+    with input_path.open("a", encoding="utf-8") as handle:
+        handle.write("cd|2\n\nef|3\n")
+    appended = run_script("-b", "2", "--index", str(index_path), str(input_path))
+    assert appended.returncode == 0
+    assert appended.stdout == run_script("-b", "2", str(input_path)).stdout
+    cached_body = "".join(first.stdout.splitlines(keepends=True)[:-1])
+    assert index_path.read_text(encoding="utf-8").startswith(cached_body)
+
+    with input_path.open("a", encoding="utf-8") as handle:
+        handle.write("much wider|4\n")
+    widened = run_script("-b", "2", "--index", str(index_path), str(input_path))
+    assert widened.stdout == run_script("-b", "2", str(input_path)).stdout
+    assert "| much wider | 4 |" in widened.stdout
+
+
+def test_head_tail_and_rows_select_rows_before_measuring(tmp_path: Path) -> None:
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("h|v\n\nr1|1\nr2|22\n\nr3|333\nwide row|4\n", encoding="utf-8")
+
+    def render(text: str) -> str:
+        return run_script("-b", "2", "-", input_data=text).stdout
+
+    assert run_script("-b", "2", "--head", "2", str(input_path)).stdout == render("h|v\nr1|1\n")
+    assert run_script("-b", "2", "--tail", "2", str(input_path)).stdout == render(
+        "r3|333\nwide row|4\n"
+    )
+    middle = render("r1|1\nr2|22\nr3|333\n")
+    assert run_script("-b", "2", "--rows", "2:4", str(input_path)).stdout == middle
+    index_path = tmp_path / "input.rows"
+    for _ in range(2):
+        indexed = run_script(
+            "-b", "2", "--rows", "2:4", "--rows-index", str(index_path), str(input_path)
+        )
+        assert indexed.stdout == middle
+    assert index_path.exists()
+
+
+def test_tail_from_stdin_and_invalid_row_range() -> None:
+    result = run_script("--tail", "1", "-", input_data="a|b\nc|d\n")
+    assert result.stdout.splitlines()[1] == "| c | d |"
+
+    result = run_script("--rows", "5:2", "-", input_data="a|b\n")
+    assert result.returncode == 2
+    assert "row range must be START:END" in result.stderr
+
+
+def test_closed_pipe_stops_rendering_quietly(tmp_path: Path) -> None:
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("".join(f"{idx}|value {idx}\n" for idx in range(200000)), encoding="utf-8")
+    env = {**os.environ, "PYTHONPATH": str(SRC_PATH)}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "table_tool", "--output-buffer", "4K", str(input_path)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+    )
+    assert process.stdout is not None and process.stderr is not None
+    assert process.stdout.readline().startswith(b"+")
+    process.stdout.close()
+    stderr = process.stderr.read()
+    process.wait(timeout=60)
+
+    assert process.returncode == 1
+    assert stderr == b""
+
+
+def test_csv_fields_with_quotes_delimiters_and_line_breaks(tmp_path: Path) -> None:
+    input_path = tmp_path / "input.csv"
+    input_path.write_text('name, note\n"Smith, J","said ""hi""\nthen left"\n', encoding="utf-8")
+
+    result = run_script("-d", ",", "--csv", str(input_path))
+
+    expected_output = "\n".join(
+        [
+            "+----------+-----------+",
+            "| name     | note      |",
+            "+----------+-----------+",
+            '| Smith, J | said "hi" |',
+            "|          | then left |",
+            "+----------+-----------+",
+            "",
+        ]
+    )
+    assert result.returncode == 0
+    assert result.stdout == expected_output
+    streamed = run_script("-d", ",", "--csv", "--stream", str(input_path))
+    assert streamed.stdout == expected_output
+
+
+def test_follow_relayouts_when_a_column_grows() -> None:
+    env = {**os.environ, "PYTHONPATH": str(SRC_PATH)}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "table_tool", "--follow", "--relayout-interval", "60", "-"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+        env=env,
+    )
+    assert process.stdin is not None and process.stdout is not None
+    process.stdin.write("a|bb\n")
+    process.stdin.flush()
+    first_lines = [process.stdout.readline() for _ in range(2)]
+    process.stdin.write("long value|z\n")
+    process.stdin.flush()
+    # The wider row is shown at once, cut to the current widths.
+    second_lines = [process.stdout.readline() for _ in range(2)]
+    process.stdin.close()
+    rest = process.stdout.read()
+    process.wait(timeout=10)
+
+    assert first_lines == ["+---+----+\n", "| a | bb |\n"]
+    assert second_lines == ["+---+----+\n", "| … | z  |\n"]
+    # Closing the input applies the pending re-layout.
+    assert rest == "+---+----+\n" + run_script("-", input_data="a|bb\nlong value|z\n").stdout
+    assert process.returncode == 0
+
+
+def test_follow_file_until_interrupted(tmp_path: Path) -> None:
+    input_path = tmp_path / "log.txt"
+    input_path.write_text("name|n\nab|1\n", encoding="utf-8")
+    env = {**os.environ, "PYTHONPATH": str(SRC_PATH)}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "table_tool", "--follow", "--on-widen", "mark", str(input_path)],
+        stdout=subprocess.PIPE,
+        text=True,
+        env=env,
+    )
+    assert process.stdout is not None
+    assert [process.stdout.readline() for _ in range(4)][-1] == "| ab   | 1 |\n"
+    with input_path.open("a", encoding="utf-8") as handle:
+        handle.write("wider|22\n")
+    assert [process.stdout.readline() for _ in range(2)] == ["+------+---+\n", "| wid… | … |\n"]
+    process.send_signal(signal.SIGINT)
+    rest = process.stdout.read()
+    process.wait(timeout=10)
+
+    assert rest == "+======+===+\n"
+    assert process.returncode == 0
+
+    rejected = run_script("--follow", "-t", str(input_path))
+    assert rejected.returncode == 2
+    assert "--follow cannot be combined" in rejected.stderr
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from table_tool import Table
+from table_tool.render import normalise_rows, render_table
+
+
+def expected(rows: list[list[str]], style: str, interval: int | str) -> str:
+    return render_table(normalise_rows(rows), style=style, thick_border_interval=interval)
+
+
+def test_edits_render_like_a_fresh_table() -> None:
+    rng = random.Random(7)
+    values = ["", "a", "bb", "cccc", "名前", "wide value"]
+    rows = [[rng.choice(values) for _ in range(rng.randint(1, 4))] for _ in range(20)]
+    table = Table(rows)
+
+    for _ in range(200):
+        action = rng.random()
+        if action < 0.3:
+            row = [rng.choice(values) for _ in range(rng.randint(1, 4))]
+            table.append(row)
+            rows.append(row)
+        elif action < 0.5 and len(rows) > 1:
+            index = rng.randrange(-len(rows), len(rows))
+            del table[index]
+            del rows[index]
+        else:
+            index = rng.randrange(len(rows))
+            column = rng.randrange(5)
+            value = rng.choice(values)
+            table.set_cell(index, column, value)
+            rows[index] = rows[index] + [""] * (column + 1 - len(rows[index]))
+            rows[index][column] = value
+        style, interval = rng.choice([("t", 3), ("g", 0), ("m", 2), ("t", "x")])
+
+        assert table.render(style=style, thick_border_interval=interval) == expected(
+            rows, style, interval
+        )
+        assert [list(row) for row in table] == rows
+
+
+def test_removing_the_widest_cell_shrinks_its_column() -> None:
+    table = Table([["name", "longest value"], ["x", "mid value"], ["y", "mid value"]])
+
+    del table[0]
+    assert table.widths() == [1, 9]
+    table.set_cell(1, 1, "v")
+    assert table.widths() == [1, 9]
+    table.set_cell(0, 1, "v")
+    assert table.widths() == [1, 1]
+
+
+def test_unchanged_table_reuses_its_rendering() -> None:
+    table = Table([["a", "bb"], ["ccc", "d"]])
+
+    first = table.render(style="g")
+    assert table.render(style="g") is first
+    table.set_cell(1, 1, "e")
+    assert table.render(style="g") == first.replace("│ d  │", "│ e  │")
+
+
+def test_rendering_an_empty_table_is_an_error() -> None:
+    table = Table([["a"]])
+    table.render()
+    del table[0]
+
+    with pytest.raises(ValueError, match="no rows"):
+        Table().render()
+    with pytest.raises(ValueError, match="no rows"):
+        table.render()
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import pytest
+from wcwidth import wcswidth
+
+from table_tool.width import display_width, measure_widths
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["", "plain", "web-01.example.com", "名", "長い名前", "mixed 東京 text", "tab\there", "é"],
+)
+def test_display_width_matches_wcswidth(text: str) -> None:
+    expected = wcswidth(text)
+    if expected < 0:
+        expected = len(text)
+
+    assert display_width(text) == expected
+    # A second lookup is served from the memo and must agree.
+    assert display_width(text) == expected
+
+
+def test_measure_widths_matches_display_width() -> None:
+    ascii_texts = ["", "plain", "web-01.example.com"]
+    mixed_texts = [*ascii_texts, "長い名前", "tab\there", "é"]
+
+    assert measure_widths(ascii_texts) == [display_width(text) for text in ascii_texts]
+    assert measure_widths(mixed_texts) == [display_width(text) for text in mixed_texts]